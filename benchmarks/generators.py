@@ -0,0 +1,128 @@
+import os
+import random
+
+from project.MatchingResult import MatchingResult
+from project.Subtitle import Subtitle
+
+CLASSES_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'classes_data')
+
+CONSONANTS = 'бвгджзклмнпрстфхцчшщ'
+VOWELS = 'аеиоуыэюя'
+FILLER_WORDS = ('он', 'она', 'они', 'идёт', 'смотрит', 'говорит', 'медленно', 'быстро', 'тихо', 'громко', 'вдруг',
+                'потом', 'снова', 'и', 'в', 'на', 'с', 'к', 'по', 'у', 'за')
+FIRST_NAMES = ('Иван', 'Мария', 'Борис', 'Анна', 'Олег', 'Ольга', 'Пётр', 'Елена', 'Сергей', 'Наталья')
+LAST_NAMES = ('Петров', 'Смирнова', 'Годунов', 'Иванова', 'Кузнецов', 'Соколова', 'Попов', 'Лебедева')
+
+
+def read_class_keywords(classes_data_path=CLASSES_DATA_PATH):
+    keywords = []
+    for file_name in sorted(os.listdir(classes_data_path)):
+        with open(os.path.join(classes_data_path, file_name), 'r', encoding='utf-8') as file:
+            for line in file:
+                if ': ' in line:
+                    keywords.extend(keyword.strip() for keyword in line.strip().split(': ')[1].split(', '))
+    return keywords
+
+
+def generate_words(rng, count):
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+def generate_character_names(rng, count):
+    count = min(count, len(FIRST_NAMES) * (len(LAST_NAMES) + 1))
+    names = set()
+    while len(names) < count:
+        name = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.6:
+            name = f"{name} {rng.choice(LAST_NAMES)}"
+        names.add(name)
+    return sorted(names)
+
+
+def generate_action_text(rng, keywords, character_names):
+    words = ([rng.choice(keywords) for _ in range(rng.randint(1, 5))] +
+             [rng.choice(FILLER_WORDS) for _ in range(rng.randint(1, 6))])
+    if character_names and rng.random() < 0.3:
+        words.append(rng.choice(character_names).split()[0])
+    if rng.random() < 0.1:
+        words.append(f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}")
+    rng.shuffle(words)
+    return ' '.join(words) + '.'
+
+
+def generate_script(seed=0, phrases_count=500, actions_count=500, character_names_count=8, dialog_words=3000,
+                    keywords=None):
+    rng = random.Random(seed)
+    keywords = keywords or read_class_keywords()
+    character_names = generate_character_names(rng, character_names_count)
+    dialog = generate_words(rng, dialog_words)
+    phrases = [{"phrase_id": f"p{index}", "text": "",
+                "phrase_text": ' '.join(rng.choice(dialog) for _ in range(rng.randint(3, 20))) + '.'}
+               for index in range(phrases_count)]
+    actions = [{"action_id": f"a{index}", "text": generate_action_text(rng, keywords, character_names),
+                "last_update": 1}
+               for index in range(actions_count)]
+    return {
+        "script_id": f"script-{seed}",
+        "file_path": f"scripts/script-{seed}.pdf",
+        "phrases": phrases,
+        "actions": actions,
+        "character_names": character_names,
+    }
+
+
+def revise_script(script, seed=0, changed_share=0.1, removed_share=0.05, added_share=0.05, keywords=None):
+    rng = random.Random(seed)
+    keywords = keywords or read_class_keywords()
+    actions = [dict(action) for action in script["actions"]]
+    rng.shuffle(actions)
+    actions = actions[int(len(actions) * removed_share):]
+    for action in actions[:int(len(actions) * changed_share)]:
+        action["text"] = generate_action_text(rng, keywords, script["character_names"])
+        action["last_update"] += 1
+    actions += [{"action_id": f"n{seed}-{index}",
+                 "text": generate_action_text(rng, keywords, script["character_names"]),
+                 "last_update": 1}
+                for index in range(int(len(script["actions"]) * added_share))]
+    return dict(script, actions=actions)
+
+
+def generate_phrase_files(script, count, seed=0, noise=0.2, words_per_subtitle=1):
+    rng = random.Random(seed)
+    dialog = sorted({word for phrase in script["phrases"] for word in phrase["phrase_text"].rstrip('.').split()})
+    files = []
+    for index in range(count):
+        phrase = rng.choice(script["phrases"])
+        words = []
+        for word in phrase["phrase_text"].rstrip('.').split():
+            words.append(rng.choice(dialog) if rng.random() < noise else word)
+            if rng.random() < noise / 2:
+                words.append(rng.choice(dialog))
+        subtitles = []
+        for start in range(0, len(words), words_per_subtitle):
+            time = float(len(subtitles))
+            subtitles.append({"text": ' '.join(words[start:start + words_per_subtitle]),
+                              "start_time": time, "end_time": time + 1})
+        files.append({"id": f"pf{index}", "truePhraseId": phrase["phrase_id"], "subtitles": subtitles})
+    return files
+
+
+def generate_action_files(classes, count, seed=0, max_classes=6):
+    rng = random.Random(seed)
+    classes = sorted(classes)
+    return [{"id": f"af{index}", "classes": rng.sample(classes, rng.randint(1, min(max_classes, len(classes))))}
+            for index in range(count)]
+
+
+def generate_subtitle_matches(phrases, count, seed=0, matches_per_subtitle=3):
+    rng = random.Random(seed)
+    subtitle_matches = {}
+    for index in range(count):
+        subtitle = Subtitle(text=f"субтитр {index}", start_time=float(index), end_time=float(index + 1))
+        subtitle_matches[subtitle] = [MatchingResult(phrase=phrase, matching_count=rng.randint(1, phrase.words_count))
+                                      for phrase in rng.sample(phrases, min(matches_per_subtitle, len(phrases)))
+                                      if phrase.words_count]
+    return subtitle_matches
@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+import time
+
+from benchmarks.generators import generate_words
+from core import phrase_matcher
+from core.phrase_index import PhraseIndex, SoundexVocabulary
+from project.Phrase import Phrase
+
+
+def generate_script(rng, words, phrases_count):
+    vocabulary = SoundexVocabulary()
+    phrases = [Phrase(phrase_id=str(phrase_id), text='',
+                      phrase_text=' '.join(rng.choice(words) for _ in range(rng.randint(3, 20))),
+                      vocabulary=vocabulary)
+               for phrase_id in range(phrases_count)]
+    return phrases, PhraseIndex(phrases, vocabulary)
+
+
+def generate_take(rng, words, phrases, noise=0.2):
+    phrase_words = rng.choice(phrases).phrase_text.split()
+    texts = []
+    for word in phrase_words:
+        if rng.random() < noise:
+            word = rng.choice(words)
+        texts.append(word)
+        if rng.random() < noise / 2:
+            texts.append(rng.choice(words))
+    return texts
+
+
+def run(texts_list, phrases, phrase_index, prune):
+    phrase_matcher.pruning_stats.reset()
+    start = time.perf_counter()
+    results = [phrase_matcher._match_phrase(texts, phrases, None, phrase_index, prune=prune)
+               for texts in texts_list]
+    return results, time.perf_counter() - start, phrase_matcher.pruning_stats.to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Доля отсечённых фраз при поиске с верхней оценкой.')
+    parser.add_argument('--phrases', type=int, default=1500)
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--words', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = generate_words(rng, args.words)
+    phrases, phrase_index = generate_script(rng, words, args.phrases)
+    texts_list = [generate_take(rng, words, phrases) for _ in range(args.files)]
+
+    exhaustive, exhaustive_seconds, _ = run(texts_list, phrases, phrase_index, prune=False)
+    pruned, pruned_seconds, stats = run(texts_list, phrases, phrase_index, prune=True)
+    if pruned != exhaustive:
+        raise AssertionError("Результаты поиска с отсечением отличаются от полного перебора.")
+
+    result = dict(stats,
+                  phrases=args.phrases,
+                  files=args.files,
+                  exhaustive_seconds=exhaustive_seconds,
+                  pruned_seconds=pruned_seconds,
+                  speedup=exhaustive_seconds / pruned_seconds if pruned_seconds else None)
+    print(f"candidates {stats['candidates']}  evaluated {stats['evaluated']}  "
+          f"pruning rate {stats['pruning_rate']:.1%}")
+    print(f"exhaustive {exhaustive_seconds:.3f}s  pruned {pruned_seconds:.3f}s  speedup {result['speedup']:.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+from benchmarks.generators import generate_phrase_files, generate_script
+from core.json_encoder import object_to_json
+from core.phrase_index import PhraseIndex, SoundexVocabulary
+from core.phrase_matcher import match_phrases
+from core.response_encoder import encode_phrase_result, iter_json_array
+from project.Phrase import Phrase
+from project.Subtitle import Subtitle
+
+
+def legacy_encode(results):
+    return json.dumps(object_to_json(results), ensure_ascii=False, indent=4)
+
+
+def fast_encode(results, pretty=False):
+    return ''.join(iter_json_array(results, encode_phrase_result, pretty))
+
+
+def measure(function, results, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = function(results)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(results)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": min(timings), "peak_bytes": peak, "output_bytes": len(output.encode('utf-8'))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение сериализации ответов сопоставления фраз.')
+    parser.add_argument('--phrases', type=int, default=1000)
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    script = generate_script(args.seed, phrases_count=args.phrases, actions_count=0)
+    vocabulary = SoundexVocabulary()
+    phrases = [Phrase(**phrase, vocabulary=vocabulary) for phrase in script["phrases"]]
+    files = [dict(file, subtitles=[Subtitle.from_dict(subtitle) for subtitle in file["subtitles"]])
+             for file in generate_phrase_files(script, args.files, args.seed, words_per_subtitle=1)]
+    with contextlib.redirect_stderr(io.StringIO()):
+        results = match_phrases(files, phrases, phrase_index=PhraseIndex(phrases, vocabulary))
+    matched = sum(1 for result in results if result["file"]["subtitles"] and "best_match" in result)
+    if not matched:
+        raise AssertionError("Ни один дубль не сопоставлен: сериализация пустых ответов ничего не измеряет.")
+
+    if json.loads(fast_encode(results)) != json.loads(legacy_encode(results)):
+        raise AssertionError("Компактный ответ отличается от текущего.")
+    if fast_encode(results, pretty=True) != legacy_encode(results):
+        raise AssertionError("Форматированный ответ отличается от текущего.")
+
+    report = {
+        "files": args.files,
+        "matched": matched,
+        "legacy": measure(legacy_encode, results, args.repeat),
+        "compact": measure(fast_encode, results, args.repeat),
+        "pretty": measure(lambda items: fast_encode(items, pretty=True), results, args.repeat),
+    }
+    print(f"matched {matched} of {len(results)}")
+    for name in ("legacy", "compact", "pretty"):
+        result = report[name]
+        print(f"{name:<8} {result['seconds']:.4f}s  peak {result['peak_bytes'] / 2 ** 20:.1f} MiB  "
+              f"output {result['output_bytes'] / 2 ** 20:.1f} MiB")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = [
+    'core.lemmatizer',
+    'core.text_classifier',
+    'core.actions_matcher',
+    'core.phrase_matcher',
+    'project.ScriptFile',
+    'project.RoughCutProject',
+    'main',
+]
+
+IMPORT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import {module}
+import_time = time.perf_counter() - start
+warm_up_time = None
+if {warm_up}:
+    from core import lemmatizer
+    start = time.perf_counter()
+    lemmatizer.warm_up()
+    warm_up_time = time.perf_counter() - start
+print(json.dumps({{"import": import_time, "warm_up": warm_up_time}}))
+"""
+
+
+def measure(module, warm_up=False, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(module=module, warm_up=warm_up)],
+                                check=True, capture_output=True, text=True).stdout
+        timings.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "import_seconds": min(timing["import"] for timing in timings),
+        "warm_up_seconds": min(timing["warm_up"] for timing in timings) if warm_up else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время импорта модулей сервиса в чистом интерпретаторе.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = [measure(module, repeat=args.repeat) for module in MODULES]
+    results.append(measure('main', warm_up=True, repeat=args.repeat))
+
+    for result in results:
+        warm_up = f"  warm_up {result['warm_up_seconds']:.3f}s" if result['warm_up_seconds'] is not None else ''
+        print(f"{result['module']:<28} import {result['import_seconds']:.3f}s{warm_up}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generators import (generate_action_files, generate_phrase_files, generate_script,
+                                   generate_subtitle_matches, read_class_keywords, revise_script)
+from core import lemmatizer
+from core.actions_matcher import create_corpus, match_actions
+from core.phrase_matcher import match_phrases
+from core.text_classifier import build_character_overlay, classify_text
+from project.ScriptFile import ScriptFile
+from project.Subtitle import Subtitle
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SIZES = (100, 500, 2000)
+MIN_MATCHED_SHARE = 0.5
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(function, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            function(argument)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_size(size, files_count, repeat, seed, keywords):
+    script = generate_script(seed, phrases_count=size, actions_count=size, keywords=keywords)
+    revised = revise_script(script, seed + 1, keywords=keywords)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        script_file = ScriptFile(**script, export_statistics=False)
+    character_overlay = build_character_overlay(script["character_names"])
+    texts = [action["text"] for action in script["actions"]]
+    classes = {class_name for action in script_file.actions for class_name in action.classes}
+    action_files = generate_action_files(classes or {'day'}, files_count, seed)
+    phrase_files = generate_phrase_files(script, files_count, seed)
+    subtitle_matches = generate_subtitle_matches(script_file.phrases, min(size, 200), seed)
+
+    def classify(_):
+        for text in texts:
+            classify_text(text, character_overlay=character_overlay)
+
+    def phrase_payload():
+        return [dict(file, subtitles=[Subtitle.from_dict(subtitle) for subtitle in file["subtitles"]])
+                for file in phrase_files]
+
+    # Без совпадений бенчмарк мерил бы только путь, на котором у дубля нет ни одного кандидата.
+    with contextlib.redirect_stderr(io.StringIO()):
+        phrase_results = match_phrases(phrase_payload(), script_file.phrases, phrase_index=script_file.phrase_index)
+    matched = sum(1 for result in phrase_results if "best_match" in result)
+    if matched < len(phrase_results) * MIN_MATCHED_SHARE:
+        raise AssertionError(f"Совпадение найдено только для {matched} из {len(phrase_results)} дублей.")
+
+    benchmarks = {
+        "classify_text": (classify, lemmatizer.lemmatize.cache_clear),
+        "create_corpus": (lambda _: create_corpus(script_file.actions), None),
+        "match_actions": (lambda _: match_actions(action_files, script_file.actions_corpus,
+                                                  script_file.filter_index), None),
+        "match_phrases": (lambda files: match_phrases(files, script_file.phrases,
+                                                      phrase_index=script_file.phrase_index), phrase_payload),
+        "script_update": (lambda clone: clone.update(**revised), script_file.clone),
+        "generate_matched_combinations": (lambda _: Subtitle.generate_matched_combinations(subtitle_matches), None),
+    }
+    return [{"benchmark": name, "size": size, "seconds": measure(function, repeat, setup)}
+            for name, (function, setup) in benchmarks.items()]
+
+
+def compare(baseline_path, results):
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {(result["benchmark"], result["size"]): result["seconds"] for result in json.load(file)["results"]}
+    for result in results:
+        previous = baseline.get((result["benchmark"], result["size"]))
+        if previous:
+            print(f"{result['benchmark']:<32} {result['size']:>6}  {previous:.4f}s -> {result['seconds']:.4f}s  "
+                  f"x{result['seconds'] / previous:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Набор бенчмарков на синтетических сценариях и субтитрах.')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='размеры сценария (число фраз и действий) через запятую')
+    parser.add_argument('--files', type=int, default=200, help='число файлов в запросах сопоставления')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='путь к JSON с результатами, по умолчанию benchmarks/results/<commit>.json')
+    parser.add_argument('--compare', help='JSON с результатами другого коммита для сравнения')
+    args = parser.parse_args()
+
+    keywords = read_class_keywords()
+    results = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        for result in run_size(size, args.files, args.repeat, args.seed, keywords):
+            print(f"{result['benchmark']:<32} {result['size']:>6}  {result['seconds']:.4f}s")
+            results.append(result)
+
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "files": args.files,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    output_path = args.output or os.path.join(RESULTS_PATH, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=4)
+    print(f"Результаты записаны в {output_path}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
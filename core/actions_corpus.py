@@ -0,0 +1,153 @@
+import copy
+from collections import Counter, defaultdict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class ActionsCorpus:
+    def __init__(self, actions, excluded_classes=()):
+        self.excluded_classes = frozenset(excluded_classes)
+        self.actions = []
+        self.vocabulary = {}
+        self.doc_freq = []
+        self._rows = {}
+        self._idf_weights = None
+        self._matrix = None
+        self.update(actions)
+
+    def update(self, actions):
+        actions = list(actions)
+        current_actions = {action.action_id: action for action in actions}
+        changed = len(actions) != len(self.actions) or any(
+            action is not previous for action, previous in zip(actions, self.actions))
+
+        for action_id, (action, _, _) in list(self._rows.items()):
+            if current_actions.get(action_id) is not action:
+                self._remove_row(action_id)
+                changed = True
+        for action in actions:
+            if action.action_id not in self._rows:
+                self._add_row(action)
+                changed = True
+
+        self.actions = actions
+        if changed:
+            self._idf_weights = None
+            self._matrix = None
+
+    def copy(self):
+        corpus = copy.copy(self)
+        corpus.vocabulary = dict(self.vocabulary)
+        corpus.doc_freq = list(self.doc_freq)
+        corpus._rows = dict(self._rows)
+        return corpus
+
+    def _add_row(self, action):
+        columns = []
+        counts = []
+        for token, count in Counter(action.classes).items():
+            if token in self.excluded_classes:
+                continue
+            column = self.vocabulary.get(token)
+            if column is None:
+                column = self.vocabulary[token] = len(self.vocabulary)
+                self.doc_freq.append(0)
+            self.doc_freq[column] += 1
+            columns.append(column)
+            counts.append(count)
+        self._rows[action.action_id] = (action, np.asarray(columns, dtype=np.int32),
+                                        np.asarray(counts, dtype=np.float64))
+
+    def _remove_row(self, action_id):
+        _, columns, _ = self._rows.pop(action_id)
+        for column in columns:
+            self.doc_freq[column] -= 1
+
+    @property
+    def idf_weights(self):
+        if self._idf_weights is None:
+            doc_freq = np.asarray(self.doc_freq, dtype=np.float64)
+            weights = np.zeros(len(doc_freq))
+            present = doc_freq > 0
+            weights[present] = np.log(len(self.actions) / doc_freq[present])
+            self._idf_weights = weights
+        return self._idf_weights
+
+    @property
+    def idf(self):
+        weights = self.idf_weights
+        return {token: float(weights[column]) for token, column in self.vocabulary.items()
+                if self.doc_freq[column] > 0}
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            rows = [self._rows[action.action_id] for action in self.actions]
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            np.cumsum([len(columns) for _, columns, _ in rows], out=indptr[1:])
+            indices = np.concatenate([columns for _, columns, _ in rows]) if rows else np.zeros(0, dtype=np.int32)
+            data = np.concatenate([counts for _, _, counts in rows]) if rows else np.zeros(0)
+            matrix = csr_matrix((data * self.idf_weights[indices], indices, indptr),
+                                shape=(len(rows), len(self.vocabulary)))
+            self._matrix = _normalize_rows(matrix)
+        return self._matrix
+
+    def vectorize(self, texts):
+        data = []
+        indices = []
+        indptr = [0]
+        for text in texts:
+            for token, count in Counter(text).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    indices.append(column)
+                    data.append(count)
+            indptr.append(len(indices))
+
+        matrix = csr_matrix((np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), indptr),
+                            shape=(len(texts), len(self.vocabulary)))
+        matrix.data *= self.idf_weights[matrix.indices]
+        return _normalize_rows(matrix)
+
+    def similarities(self, texts):
+        if not self.actions:
+            return np.zeros((len(texts), 0))
+        matrix = self.matrix
+        return (self.vectorize(texts) @ matrix.T).toarray()
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+    return matrix
+
+
+class ActionsFilterIndex:
+    def __init__(self, actions, kinds):
+        self.size = len(actions)
+        self.kinds = {kind: frozenset(kind_classes) for kind, kind_classes in kinds.items()}
+        self.postings = {}
+        self.has_none = {}
+        for kind, kind_classes in self.kinds.items():
+            postings = defaultdict(list)
+            for index, action in enumerate(actions):
+                for cls in kind_classes.intersection(action.classes):
+                    postings[cls].append(index)
+            has_any = np.zeros(self.size, dtype=bool)
+            for cls, indices in postings.items():
+                has_any[indices] = True
+            self.postings[kind] = {cls: np.asarray(indices, dtype=np.int32) for cls, indices in postings.items()}
+            self.has_none[kind] = ~has_any
+
+    def mask(self, kind, file_classes):
+        kind_classes = self.kinds[kind]
+        if not kind_classes:
+            return np.ones(self.size, dtype=bool)
+        mask = self.has_none[kind].copy()
+        for cls in kind_classes.intersection(file_classes):
+            posting = self.postings[kind].get(cls)
+            if posting is not None:
+                mask[posting] = True
+        return mask
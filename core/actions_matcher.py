@@ -1,7 +1,7 @@
-import math
-from collections import defaultdict, Counter
+import numpy as np
 
-import icecream
+from core import metrics
+from core.actions_corpus import ActionsCorpus, ActionsFilterIndex
 
 
 def read_words_from_file(file_path):
@@ -20,98 +20,61 @@ macro_locations = read_words_from_file('core/classes/macro_locations.txt')
 locations = read_words_from_file('core/classes/locations.txt')
 
 
+DAYTIME = 'daytime'
+LOCATION = 'location'
+MACRO_LOCATION = 'macro_location'
+
+
 def create_corpus(actions):
-    doc_freq = defaultdict(int)
-    total_docs = len(actions)
-
-    for action in actions:
-        unique_tokens = set(action.classes)
-        for token in unique_tokens:
-            if token not in macro_locations and token not in locations and token not in daytime_classes:
-                doc_freq[token] += 1
-
-    idf = {token: math.log(total_docs / freq) for token, freq in doc_freq.items()}
-
-    for action in actions:
-        tf = Counter(action.classes)
-        total_tokens = len(action.classes)
-        tfidf = {token: (count / total_tokens) * idf[token] for token, count in tf.items() if token in idf}
-        action.tfidf_vector = tfidf
-    return idf
-
-
-def vectorize_text(texts, idf):
-    vectors = []
-    for text in texts:
-        tf = Counter(text)
-        total_tokens = len(text)
-        tfidf = {token: (count / total_tokens) * idf[token] for token, count in tf.items() if token in idf}
-        vectors.append(tfidf)
-    return vectors
-
-
-def calculate_cosine_similarity(vector1, vector2):
-    all_items = set(vector1.keys()).union(vector2.keys())
-    vec1 = [vector1.get(item, 0) for item in all_items]
-    vec2 = [vector2.get(item, 0) for item in all_items]
-
-    dot_product = sum(v1 * v2 for v1, v2 in zip(vec1, vec2))
-    norm1 = math.sqrt(sum(v1 * v1 for v1 in vec1))
-    norm2 = math.sqrt(sum(v2 * v2 for v2 in vec2))
-
-    return dot_product / (norm1 * norm2) if norm1 and norm2 else 0.0
-
-
-def match_action(file, actions, idf_corpus):
-    file_vector = vectorize_text([file['classes']], idf_corpus)[0]
-    icecream.ic(file_vector)
-    max_similarity = 0
-    best_action = None
-
-    for action in actions:
-        similarity = calculate_cosine_similarity(file_vector, action.tfidf_vector)
-        if similarity > max_similarity:
-            max_similarity = similarity
-            best_action = action
-
-    return best_action, max_similarity
-
-
-def match_actions(files, actions, idf_corpus):
-    result = []
-
-    for file in files:
-        file_classes = file['classes']
-        file_daytime_classes = set(file_classes).intersection(set(daytime_classes))
-        file_location_classes = set(file_classes).intersection(set(locations))
-        file_macro_location_classes = set(file_classes).intersection(set(macro_locations))
-
-        filtered_actions = []
-        for action in actions:
-            action_classes = set(action.classes)
-            if (not daytime_classes or file_daytime_classes.intersection(action_classes) or not any(
-                    cls in action_classes for cls in daytime_classes)) and \
-                    (not locations or file_location_classes.intersection(action_classes) or not any(
-                        cls in action_classes for cls in locations)):
-                filtered_actions.append(action)
-
-        if not filtered_actions:
-            for action in actions:
-                action_classes = set(action.classes)
-                if (not daytime_classes or file_daytime_classes.intersection(action_classes) or not any(
-                        cls in action_classes for cls in daytime_classes)) and \
-                        (not macro_locations or file_macro_location_classes.intersection(action_classes) or not any(
-                            cls in action_classes for cls in macro_locations)):
-                    filtered_actions.append(action)
-
-        best_action, max_similarity = None, 0
-        for action in filtered_actions:
-            similarity = calculate_cosine_similarity(vectorize_text([file_classes], idf_corpus)[0], action.tfidf_vector)
-            if similarity > max_similarity:
-                max_similarity = similarity
-                best_action = action
+    with metrics.timed('corpus_build', items=len(actions)):
+        return ActionsCorpus(actions, excluded_classes=macro_locations + locations + daytime_classes)
 
-        if best_action:
-            result.append((file['id'], best_action.action_id, max_similarity))
 
-    return result
+def create_filter_index(actions):
+    return ActionsFilterIndex(actions, {
+        DAYTIME: daytime_classes,
+        LOCATION: locations,
+        MACRO_LOCATION: macro_locations,
+    })
+
+
+def _best_action(actions, similarities):
+    if len(similarities) == 0:
+        return None, 0
+    best_index = int(np.argmax(similarities))
+    max_similarity = float(similarities[best_index])
+    if max_similarity <= 0:
+        return None, 0
+    return actions[best_index], max_similarity
+
+
+def _filter_actions_mask(file_classes, filter_index):
+    daytime_mask = filter_index.mask(DAYTIME, file_classes)
+    mask = daytime_mask & filter_index.mask(LOCATION, file_classes)
+    if not mask.any():
+        mask = daytime_mask & filter_index.mask(MACRO_LOCATION, file_classes)
+    return mask
+
+
+def match_actions(files, corpus, filter_index):
+    return list(iter_match_actions(files, corpus, filter_index))
+
+
+def iter_match_actions(files, corpus, filter_index, chunk_size=None):
+    for file, best_action, max_similarity in iter_best_actions(files, corpus, filter_index, chunk_size):
+        if best_action:
+            yield file['id'], best_action.action_id, max_similarity
+
+
+def iter_best_actions(files, corpus, filter_index, chunk_size=None):
+    files = list(files)
+    chunk_size = chunk_size or max(len(files), 1)
+    for chunk_start in range(0, len(files), chunk_size):
+        chunk = files[chunk_start:chunk_start + chunk_size]
+        with metrics.timed('scoring', items=len(chunk)):
+            similarities = corpus.similarities([file['classes'] for file in chunk])
+        for file, file_similarities in zip(chunk, similarities):
+            with metrics.timed('candidate_filtering', items=1):
+                mask = _filter_actions_mask(file['classes'], filter_index)
+            best_action, max_similarity = _best_action(corpus.actions, np.where(mask, file_similarities, 0))
+            yield file, best_action, max_similarity
@@ -0,0 +1,47 @@
+import math
+import os
+from multiprocessing import Pool
+
+from core import lemmatizer, text_classifier
+
+CLASSIFIER_WORKERS = int(os.environ.get('CLASSIFIER_WORKERS', '0'))
+MIN_PARALLEL_TEXTS = 64
+CHUNKS_PER_WORKER = 4
+SERIAL_CHUNK_SIZE = 256
+
+_character_overlay = frozenset()
+
+
+def _init_worker(character_overlay):
+    global _character_overlay
+    lemmatizer.warm_up()
+    _character_overlay = character_overlay
+
+
+def _classify_chunk(texts, character_overlay=None):
+    if character_overlay is None:
+        character_overlay = _character_overlay
+    return text_classifier.classify_texts(texts, character_overlay)
+
+
+def classify_texts_parallel(texts, character_names, workers=None, on_progress=None):
+    if workers is None:
+        workers = CLASSIFIER_WORKERS
+    character_overlay = text_classifier.build_character_overlay(character_names)
+    if workers < 2 or len(texts) < MIN_PARALLEL_TEXTS:
+        chunks = [texts[i:i + SERIAL_CHUNK_SIZE] for i in range(0, len(texts), SERIAL_CHUNK_SIZE)]
+        return _collect((_classify_chunk(chunk, character_overlay) for chunk in chunks), on_progress)
+
+    chunk_size = math.ceil(len(texts) / (workers * CHUNKS_PER_WORKER))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with Pool(workers, initializer=_init_worker, initargs=(character_overlay,)) as pool:
+        return _collect(pool.imap(_classify_chunk, chunks), on_progress)
+
+
+def _collect(chunk_results, on_progress):
+    classifications = []
+    for chunk in chunk_results:
+        classifications.extend(chunk)
+        if on_progress is not None:
+            on_progress(len(chunk))
+    return classifications
@@ -0,0 +1,232 @@
+import hashlib
+import mmap
+import os
+import struct
+from collections import defaultdict
+from functools import lru_cache
+
+FORMAT_VERSION = 1
+MAGIC = b'CLRCDICT'
+ARTIFACT_PATH = os.environ.get('CLASSIFIER_ARTIFACT_PATH', 'build/classifier.bin')
+CLASSES_DATA_PATH = 'core/classes_data'
+LOOKUP_CACHE_SIZE = 100_000
+
+OBJECT = 'object'
+LOCATION = 'location'
+AUDIO = 'audio'
+ACTION = 'action'
+DAYTIME = 'daytime'
+
+CATEGORY_FILES = {
+    OBJECT: 'objects_classes_synonyms.txt',
+    LOCATION: 'location_classes_synonyms.txt',
+    AUDIO: 'audio_classes_synonyms.txt',
+    ACTION: 'action_classes_synonyms.txt',
+    DAYTIME: 'daytime_classes_synonyms.txt',
+}
+
+_HEADER = struct.Struct('<8sI20s9I')
+_ENTRY = struct.Struct('<5I')
+_ANCHOR = struct.Struct('<3I')
+_UINT = struct.Struct('<I')
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+def category_paths(classes_data_path=CLASSES_DATA_PATH):
+    return {category: os.path.join(classes_data_path, file_name) for category, file_name in CATEGORY_FILES.items()}
+
+
+def parse_synonyms(lines):
+    data_dict = {}
+    conflicts = []
+    for line in lines:
+        class_name, keywords = line.strip().split(': ')
+        for keyword in keywords.split(', '):
+            if keyword in data_dict:
+                conflicts.append((keyword, class_name, data_dict[keyword]))
+            data_dict[keyword] = class_name
+    return data_dict, conflicts
+
+
+def load_synonyms_file(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return parse_synonyms(file)
+
+
+def sources_fingerprint(paths):
+    # Размер и время изменения файлов вместо хэша содержимого: при запуске сервиса словари не читаются.
+    digest = hashlib.sha1()
+    for category in sorted(paths):
+        stat = os.stat(paths[category])
+        digest.update(f"{category}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.digest()
+
+
+def build_keyword_index(dicts):
+    word_frequency = defaultdict(int)
+    for classes_dict in dicts.values():
+        for key in classes_dict:
+            for word in set(key.split()):
+                word_frequency[word] += 1
+
+    index = defaultdict(list)
+    for category, classes_dict in dicts.items():
+        for key, class_name in classes_dict.items():
+            key_words = frozenset(key.split())
+            anchor = min(key_words, key=lambda word: (word_frequency[word], word), default='')
+            index[anchor].append((category, key, class_name, key_words))
+    return {anchor: tuple(entries) for anchor, entries in index.items()}
+
+
+def write_artifact(path, keyword_index, fingerprint):
+    strings = set(keyword_index)
+    for entries in keyword_index.values():
+        for category, key, class_name, key_words in entries:
+            strings.update((category, key, class_name))
+            strings.update(key_words)
+    # Строки упорядочены по байтам UTF-8, чтобы искать их двоичным поиском прямо в отображённом файле.
+    encoded_strings = sorted(string.encode('utf-8') for string in strings)
+    string_ids = {string.decode('utf-8'): string_id for string_id, string in enumerate(encoded_strings)}
+
+    string_offsets = [0]
+    for string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    entries_table = bytearray()
+    words_table = bytearray()
+    anchors_table = bytearray()
+    entries_count = 0
+    words_count = 0
+    for anchor in sorted(keyword_index, key=string_ids.get):
+        anchors_table += _ANCHOR.pack(string_ids[anchor], entries_count, len(keyword_index[anchor]))
+        for category, key, class_name, key_words in keyword_index[anchor]:
+            entries_table += _ENTRY.pack(string_ids[category], string_ids[key], string_ids[class_name],
+                                         words_count, len(key_words))
+            for word in sorted(key_words):
+                words_table += _UINT.pack(string_ids[word])
+            words_count += len(key_words)
+            entries_count += 1
+
+    sections = [struct.pack(f'<{len(string_offsets)}I', *string_offsets), b''.join(encoded_strings),
+                bytes(entries_table), bytes(words_table), bytes(anchors_table)]
+    section_offsets = []
+    position = _HEADER.size
+    for section in sections:
+        section_offsets.append(position)
+        position += len(section)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, fingerprint, len(encoded_strings), entries_count, words_count,
+                          len(keyword_index), *section_offsets)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    os.replace(temporary_path, path)
+
+
+class MappedKeywordIndex:
+    """Индекс ключевых слов, читаемый напрямую из отображённого в память артефакта.
+    Повторяет интерфейс словаря anchor -> tuple(entries), который строит build_keyword_index."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < _HEADER.size:
+            raise ArtifactError(f"Файл '{path}' слишком короткий для артефакта классификатора.")
+        (magic, version, self.fingerprint, self.strings_count, self.entries_count, self.words_count,
+         self.anchors_count, self._string_offsets, self._strings, self._entries, self._words,
+         self._anchors) = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ArtifactError(f"Файл '{path}' не является артефактом классификатора.")
+        if version != FORMAT_VERSION:
+            raise ArtifactError(f"Артефакт '{path}' имеет версию {version}, ожидается {FORMAT_VERSION}.")
+        self.path = path
+        self.get_entries = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def __len__(self):
+        return self.anchors_count
+
+    def __contains__(self, token):
+        return bool(self.get_entries(token))
+
+    def get(self, token, default=None):
+        return self.get_entries(token) or default
+
+    def items(self):
+        for anchor_index in range(self.anchors_count):
+            anchor_id, start, count = _ANCHOR.unpack_from(self._buffer, self._anchors + anchor_index * _ANCHOR.size)
+            yield self._string(anchor_id), self._decode_entries(start, count)
+
+    def _string(self, string_id):
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def _string_bytes(self, string_id):
+        start, end = struct.unpack_from('<2I', self._buffer, self._string_offsets + string_id * _UINT.size)
+        return self._buffer[self._strings + start:self._strings + end]
+
+    def _find_string(self, token):
+        encoded = token.encode('utf-8')
+        low, high = 0, self.strings_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._string_bytes(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.strings_count and self._string_bytes(low) == encoded:
+            return low
+        return -1
+
+    def _find_anchor(self, string_id):
+        low, high = 0, self.anchors_count
+        while low < high:
+            middle = (low + high) // 2
+            if _UINT.unpack_from(self._buffer, self._anchors + middle * _ANCHOR.size)[0] < string_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.anchors_count:
+            anchor_id, start, count = _ANCHOR.unpack_from(self._buffer, self._anchors + low * _ANCHOR.size)
+            if anchor_id == string_id:
+                return start, count
+        return None
+
+    def _lookup(self, token):
+        string_id = self._find_string(token)
+        if string_id < 0:
+            return ()
+        anchor = self._find_anchor(string_id)
+        if anchor is None:
+            return ()
+        return self._decode_entries(*anchor)
+
+    def _decode_entries(self, start, count):
+        entries = []
+        for entry_index in range(start, start + count):
+            category_id, key_id, class_id, words_start, words_count = _ENTRY.unpack_from(
+                self._buffer, self._entries + entry_index * _ENTRY.size)
+            key_words = frozenset(
+                self._string(_UINT.unpack_from(self._buffer, self._words + word_index * _UINT.size)[0])
+                for word_index in range(words_start, words_start + words_count))
+            entries.append((self._string(category_id), self._string(key_id), self._string(class_id), key_words))
+        return tuple(entries)
+
+
+def load_keyword_index(artifact_path=ARTIFACT_PATH, classes_data_path=CLASSES_DATA_PATH):
+    paths = category_paths(classes_data_path)
+    fingerprint = sources_fingerprint(paths)
+    if artifact_path and os.path.exists(artifact_path):
+        try:
+            index = MappedKeywordIndex(artifact_path)
+        except ArtifactError as e:
+            print(f"{e} Словари будут разобраны из исходных файлов.")
+        else:
+            if index.fingerprint == fingerprint:
+                return index
+            print(f"Артефакт '{artifact_path}' устарел относительно словарей, они будут разобраны из исходных файлов.")
+    return build_keyword_index({category: load_synonyms_file(path)[0] for category, path in paths.items()})
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from core.classifier_artifact import (ARTIFACT_PATH, CLASSES_DATA_PATH, build_keyword_index, category_paths,
+                                      parse_synonyms, sources_fingerprint, write_artifact)
+from core.lemmatizer import get_stop_words, lemmatize
+
+
+def normalize_line(line):
+    stop_words = get_stop_words()
+    class_name, words = line.split(':')
+    processed_words = []
+    for word in words.split(','):
+        word = word.strip()
+        if word not in stop_words:
+            processed_words.append(lemmatize(word))
+    return f"{class_name.strip()}: {', '.join(processed_words)}"
+
+
+def read_source(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return [line for line in file.read().split('\n') if line.strip()]
+
+
+FORMAT_PROBLEM = "ожидается 'класс: синонимы'"
+
+
+def validate_source(category, lines):
+    stop_words = get_stop_words()
+    problems = []
+    for line_number, line in enumerate(lines, start=1):
+        parts = line.strip().split(': ')
+        if len(parts) != 2:
+            problems.append({"category": category, "line": line_number, "problem": FORMAT_PROBLEM})
+            continue
+        for keyword in parts[1].split(', '):
+            if not keyword.strip():
+                problems.append({"category": category, "line": line_number, "problem": "пустой синоним"})
+            elif any(word in stop_words for word in keyword.split()):
+                problems.append({"category": category, "line": line_number, "keyword": keyword,
+                                 "problem": "синоним содержит стоп-слово и не может совпасть с текстом"})
+    return problems
+
+
+def _has_format_problems(problems):
+    return any(problem["problem"] == FORMAT_PROBLEM for problem in problems)
+
+
+def _compile_source(task):
+    category, file_path, normalize = task
+    lines = read_source(file_path)
+    problems = validate_source(category, lines)
+    if _has_format_problems(problems):
+        return category, lines, None, [], problems
+    if normalize:
+        lines = [normalize_line(line) for line in lines]
+        problems = validate_source(category, lines)
+        if _has_format_problems(problems):
+            return category, lines, None, [], problems
+    data_dict, conflicts = parse_synonyms(lines)
+    return category, lines, data_dict, conflicts, problems
+
+
+def compile_dictionaries(classes_data_path=CLASSES_DATA_PATH, artifact_path=ARTIFACT_PATH, normalize=False,
+                         rewrite_sources=False, workers=None):
+    paths = category_paths(classes_data_path)
+    tasks = [(category, path, normalize) for category, path in paths.items()]
+    with Pool(workers or min(len(tasks), os.cpu_count() or 1)) as pool:
+        compiled = pool.map(_compile_source, tasks)
+
+    report = {"artifact": artifact_path, "conflicts": [], "problems": []}
+    dicts = {}
+    sources = {}
+    for category, lines, data_dict, conflicts, problems in compiled:
+        report["problems"].extend(problems)
+        report["conflicts"].extend({"category": category, "keyword": keyword, "class_name": class_name,
+                                    "previous_class_name": previous_class_name}
+                                   for keyword, class_name, previous_class_name in conflicts)
+        if data_dict is not None:
+            dicts[category] = data_dict
+            sources[category] = lines
+
+    if len(dicts) != len(paths):
+        report["artifact"] = None
+        return report
+
+    keyword_index = build_keyword_index(dicts)
+    # Исходные файлы переписываются только когда собраны все словари, и до подсчёта отпечатка артефакта.
+    if rewrite_sources:
+        for category, lines in sources.items():
+            with open(paths[category], 'w', encoding='utf-8') as file:
+                file.write('\n'.join(lines))
+    write_artifact(artifact_path, keyword_index, sources_fingerprint(paths))
+    report["keywords"] = sum(len(data_dict) for data_dict in dicts.values())
+    report["anchors"] = len(keyword_index)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Компиляция словарей синонимов в артефакт классификатора.')
+    parser.add_argument('--classes-data', default=CLASSES_DATA_PATH, help='каталог с файлами синонимов')
+    parser.add_argument('--output', default=ARTIFACT_PATH, help='путь к артефакту')
+    parser.add_argument('--normalize', action='store_true', help='лемматизировать синонимы перед компиляцией')
+    parser.add_argument('--rewrite-sources', action='store_true',
+                        help='записать нормализованные синонимы обратно в исходные файлы')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--report', help='путь к JSON-отчёту о конфликтах и ошибках')
+    parser.add_argument('--strict', action='store_true', help='завершиться с ошибкой при конфликтах')
+    args = parser.parse_args()
+
+    report = compile_dictionaries(args.classes_data, args.output, args.normalize, args.rewrite_sources, args.workers)
+    for conflict in report["conflicts"]:
+        print('CONFLICT', conflict["category"], conflict["keyword"], conflict["class_name"],
+              conflict["previous_class_name"])
+    for problem in report["problems"]:
+        print('PROBLEM', json.dumps(problem, ensure_ascii=False))
+    if report["artifact"]:
+        print(f"Артефакт {report['artifact']}: {report['keywords']} синонимов, {report['anchors']} якорей, "
+              f"{len(report['conflicts'])} конфликтов.")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+
+    if report["artifact"] is None or (args.strict and report["conflicts"]):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
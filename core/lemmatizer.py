@@ -0,0 +1,109 @@
+import os
+import string
+import threading
+from functools import lru_cache
+
+from core import metrics
+
+LEMMA_CACHE_SIZE = 100_000
+NLTK_DATA_PATH = os.environ.get('NLTK_DATA_PATH', 'nltk_data')
+NLTK_RESOURCES = (
+    ('corpora/stopwords',),
+    ('tokenizers/punkt', 'tokenizers/punkt_tab'),
+)
+
+punctuation_table = str.maketrans('', '', string.punctuation)
+
+_models_lock = threading.Lock()
+_morph = None
+_stop_words = None
+_word_tokenize = None
+
+
+def _find_nltk_resources(nltk):
+    if os.path.isdir(NLTK_DATA_PATH) and NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_PATH)
+    for alternatives in NLTK_RESOURCES:
+        for resource in alternatives:
+            try:
+                nltk.data.find(resource)
+                break
+            except LookupError:
+                continue
+        else:
+            raise LookupError(f"Ресурс NLTK '{alternatives[0]}' не найден. "
+                              f"Положите его в '{NLTK_DATA_PATH}' или укажите каталог в NLTK_DATA.")
+
+
+def _load_nltk():
+    global _stop_words, _word_tokenize
+    with _models_lock:
+        if _word_tokenize is None:
+            import nltk
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize
+
+            _find_nltk_resources(nltk)
+            _stop_words = frozenset(stopwords.words('russian'))
+            _word_tokenize = word_tokenize
+
+
+def _reset_lock_after_fork():
+    global _models_lock
+    _models_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def get_morph():
+    global _morph
+    if _morph is None:
+        with _models_lock:
+            if _morph is None:
+                from pymorphy2 import MorphAnalyzer
+
+                _morph = MorphAnalyzer()
+    return _morph
+
+
+def get_stop_words():
+    if _stop_words is None:
+        _load_nltk()
+    return _stop_words
+
+
+def warm_up():
+    _load_nltk()
+    get_morph()
+    process_text('Прогрев моделей')
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(word):
+    return get_morph().parse(word)[0].normal_form
+
+
+def lemma_cache_info():
+    return lemmatize.cache_info()
+
+
+def tokenize(text):
+    if _word_tokenize is None:
+        _load_nltk()
+    tokens = _word_tokenize(text.translate(punctuation_table), language='russian')
+    return [word for word in tokens if word.lower() not in _stop_words]
+
+
+def process_text(text):
+    with metrics.timed('lemmatization', items=1):
+        return [lemmatize(word) for word in tokenize(text)]
+
+
+def process_texts(texts):
+    with metrics.timed('lemmatization', items=len(texts)):
+        tokenized_texts = [tokenize(text) for text in texts]
+        vocabulary = {word for tokens in tokenized_texts for word in tokens}
+        lemmas = {word: lemmatize(word) for word in vocabulary}
+        return [[lemmas[word] for word in tokens] for tokens in tokenized_texts]
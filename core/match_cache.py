@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from core.actions_matcher import iter_best_actions
+from core.phrase_matcher import subtitle_columns
+from core.phrase_pool import iter_match_phrases_parallel
+
+MISSING = object()
+
+
+class MatchResultsCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+def _content_key(*parts):
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def phrase_match_key(file, script_version, threshold, max_errors=0):
+    texts, start_times, end_times = subtitle_columns(file)
+    return _content_key('phrases', script_version, threshold, max_errors, file['truePhraseId'],
+                        list(texts), list(start_times), list(end_times))
+
+
+def action_match_key(file, script_version):
+    return _content_key('actions', script_version, sorted(file['classes']))
+
+
+def iter_cached_match_phrases(files, script_file, cache, threshold=0.33, max_errors=0):
+    files = list(files)
+    keys = [phrase_match_key(file, script_file.version, threshold, max_errors) for file in files]
+    responses = [cache.get(key) for key in keys]
+    missed = [file for file, response in zip(files, responses) if response is MISSING]
+    computed = iter_match_phrases_parallel(missed, script_file.phrases, threshold, script_file.phrase_index,
+                                           max_errors=max_errors)
+    for file, key, response in zip(files, keys, responses):
+        if response is MISSING:
+            response = next(computed)
+            cache.put(key, response)
+        yield _with_file_id(response, file['id'])
+
+
+def iter_cached_match_actions(files, script_file, cache, chunk_size=None):
+    files = list(files)
+    chunk_size = chunk_size or max(len(files), 1)
+    for chunk_start in range(0, len(files), chunk_size):
+        chunk = files[chunk_start:chunk_start + chunk_size]
+        keys = [action_match_key(file, script_file.version) for file in chunk]
+        best_actions = [cache.get(key) for key in keys]
+        missed = [index for index, best_action in enumerate(best_actions) if best_action is MISSING]
+        computed = iter_best_actions([chunk[index] for index in missed], script_file.actions_corpus,
+                                     script_file.filter_index)
+        for index, (_, action, similarity) in zip(missed, computed):
+            best_actions[index] = (action.action_id, similarity) if action else None
+            cache.put(keys[index], best_actions[index])
+        for file, best_action in zip(chunk, best_actions):
+            if best_action is not None:
+                yield (file['id'],) + best_action
+
+
+def _with_file_id(response, file_id):
+    response = dict(response)
+    response["file"] = dict(response["file"], id=file_id)
+    return response
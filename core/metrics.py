@@ -0,0 +1,158 @@
+import math
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+DEBUG_DUMPS = os.environ.get('DEBUG_DUMPS', '').lower() in ('1', 'true', 'yes')
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self.values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self.values.get(label_values, (None, 0.0))
+            if counts is None:
+                counts = [0] * len(self.buckets)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[label_values] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {label_values: (list(counts), total) for label_values, (counts, total) in self.values.items()}
+        for label_values, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield (self.name + '_bucket',
+                       _format_labels(self.label_names, label_values, [('le', _format_value(bound))]), cumulative)
+            yield self.name + '_sum', _format_labels(self.label_names, label_values), total
+            yield self.name + '_count', _format_labels(self.label_names, label_values), cumulative
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, collect, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.collect = collect
+
+    def samples(self):
+        for label_values, value in sorted(self.collect().items()):
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def gauge(self, name, documentation, collect, label_names=()):
+        return self.register(Gauge(name, documentation, collect, label_names))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram('clapper_stage_seconds', 'Время выполнения этапов обработки.', ('stage',))
+stage_items = registry.counter('clapper_stage_items_total', 'Число элементов, обработанных на этапе.', ('stage',))
+request_seconds = registry.histogram('clapper_request_seconds', 'Время обработки HTTP-запросов.',
+                                     ('endpoint', 'method', 'status'))
+
+
+def _reset_locks_after_fork():
+    # В дочернем процессе нет потоков родителя: захваченная ими в момент fork блокировка не освободилась бы никогда.
+    registry._lock = threading.Lock()
+    for metric in registry.metrics.values():
+        if hasattr(metric, '_lock'):
+            metric._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+@contextmanager
+def timed(stage, items=None):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(perf_counter() - start, stage)
+        if items is not None:
+            stage_items.inc(stage, amount=items)
@@ -0,0 +1,102 @@
+from array import array
+from collections import Counter, defaultdict
+
+
+class SoundexVocabulary:
+    UNKNOWN = -1
+
+    def __init__(self):
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def intern(self, code):
+        return self.codes.setdefault(code, len(self.codes))
+
+    def intern_all(self, codes):
+        return array('i', [self.intern(code) for code in codes])
+
+    def encode(self, codes):
+        get = self.codes.get
+        return array('i', [get(code, SoundexVocabulary.UNKNOWN) for code in codes])
+
+
+class PhraseIndex:
+    def __init__(self, phrases, vocabulary=None):
+        self.phrases = list(phrases)
+        if vocabulary is None:
+            vocabulary = self.phrases[0].vocabulary if self.phrases else SoundexVocabulary()
+        if any(phrase.vocabulary is not vocabulary for phrase in self.phrases):
+            raise ValueError("Все фразы индекса должны использовать один словарь soundex.")
+        self.vocabulary = vocabulary
+
+        # Позиции первых вхождений различных кодов фразы i лежат в first_positions
+        # на отрезке [phrase_offsets[i], phrase_offsets[i + 1]), сами коды берутся из prepared_soundex.
+        self.phrase_offsets = array('i', [0])
+        self.first_positions = array('i')
+        code_counts = array('i', [0]) * len(vocabulary)
+        for phrase in self.phrases:
+            seen = set()
+            for position, code in enumerate(phrase.prepared_soundex):
+                if code not in seen:
+                    seen.add(code)
+                    self.first_positions.append(position)
+                    code_counts[code] += 1
+            self.phrase_offsets.append(len(self.first_positions))
+
+        # Фразы с кодом c по возрастанию индекса лежат в posting_phrases
+        # на отрезке [posting_offsets[c], posting_offsets[c + 1]).
+        self.posting_offsets = array('i', [0])
+        for count in code_counts:
+            self.posting_offsets.append(self.posting_offsets[-1] + count)
+        self.posting_phrases = array('i', [0]) * len(self.first_positions)
+        next_slot = self.posting_offsets[:-1]
+        for phrase_index in range(len(self.phrases)):
+            for code in self._distinct_codes(phrase_index):
+                self.posting_phrases[next_slot[code]] = phrase_index
+                next_slot[code] += 1
+
+    @classmethod
+    def from_phrases(cls, phrases):
+        # Фразы, созданные без общего словаря, переводятся в один новый словарь, как того требует индекс.
+        phrases = list(phrases)
+        if len({id(phrase.vocabulary) for phrase in phrases}) > 1:
+            vocabulary = SoundexVocabulary()
+            for phrase in phrases:
+                codes = {code_id: code for code, code_id in phrase.vocabulary.codes.items()}
+                phrase.prepared_soundex = vocabulary.intern_all(codes[code_id] for code_id in phrase.prepared_soundex)
+                phrase.vocabulary = vocabulary
+        return cls(phrases)
+
+    def encode(self, codes):
+        return self.vocabulary.encode(codes)
+
+    def positions(self, phrase_index):
+        soundex = self.phrases[phrase_index].prepared_soundex
+        return {soundex[position]: position for position in self._first_positions(phrase_index)}
+
+    def code_phrases(self, code):
+        if not 0 <= code < len(self.posting_offsets) - 1:
+            return ()
+        return self.posting_phrases[self.posting_offsets[code]:self.posting_offsets[code + 1]]
+
+    def shared_counts(self, codes):
+        shared = defaultdict(int)
+        for code, count in Counter(codes).items():
+            for phrase_index in self.code_phrases(code):
+                shared[phrase_index] += count
+        return shared
+
+    def ranked_candidates(self, codes):
+        bounds = [(min(shared, len(self.phrases[phrase_index].prepared_soundex)), phrase_index)
+                  for phrase_index, shared in self.shared_counts(codes).items()]
+        bounds.sort(key=lambda item: (-item[0], item[1]))
+        return bounds
+
+    def _first_positions(self, phrase_index):
+        return self.first_positions[self.phrase_offsets[phrase_index]:self.phrase_offsets[phrase_index + 1]]
+
+    def _distinct_codes(self, phrase_index):
+        soundex = self.phrases[phrase_index].prepared_soundex
+        return [soundex[position] for position in self._first_positions(phrase_index)]
@@ -1,20 +1,63 @@
+import os
 import re
 import string
+import threading
+from functools import lru_cache
+
 from fonetika.soundex import RussianSoundex
-from icecream import ic
+
+from core import metrics
+from core.phrase_index import PhraseIndex
+from core.soundex_alignment import best_alignment, common_length
 from project.Subtitle import MatchingResult, Subtitle
 
+SOUNDEX_CACHE_SIZE = 100_000
+PHRASE_MAX_ERRORS = int(os.environ.get('PHRASE_MAX_ERRORS', '0'))
+
 soundex = RussianSoundex(delete_first_letter=True)
-soundex_dictionary = {}
 
 
+class PruningStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.searches = 0
+        self.candidates = 0
+        self.evaluated = 0
+
+    def record(self, candidates, evaluated):
+        with self.lock:
+            self.searches += 1
+            self.candidates += candidates
+            self.evaluated += evaluated
+
+    def to_json(self):
+        pruned = self.candidates - self.evaluated
+        return {
+            "searches": self.searches,
+            "candidates": self.candidates,
+            "evaluated": self.evaluated,
+            "pruned": pruned,
+            "pruning_rate": pruned / self.candidates if self.candidates else 0.0
+        }
+
+
+pruning_stats = PruningStats()
+
+
+def _reset_lock_after_fork():
+    pruning_stats.lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+@lru_cache(maxsize=SOUNDEX_CACHE_SIZE)
 def soundex_transform(text):
-    if text in soundex_dictionary:
-        return soundex_dictionary[text]
-    else:
-        result = soundex.transform(text)
-        soundex_dictionary[text] = result
-        return result
+    return soundex.transform(text)
 
 
 def remove_punctuation(txt):
@@ -37,37 +80,43 @@ def remove_enclosed_text(text: str) -> str:
     return result.strip()
 
 
-def match_phrases(files, phrases, threshold=0.33):
-    results = []
+def subtitle_columns(file):
+    if 'texts' in file:
+        texts, start_times, end_times = file['texts'], file['start_times'], file['end_times']
+        if not len(texts) == len(start_times) == len(end_times):
+            raise ValueError(f"Колонки субтитров файла '{file['id']}' имеют разную длину.")
+        return texts, start_times, end_times
+    subtitles = file['subtitles']
+    return ([sub.text for sub in subtitles],
+            [sub.start_time for sub in subtitles],
+            [sub.end_time for sub in subtitles])
+
+
+def match_phrases(files, phrases, threshold=0.33, phrase_index=None, max_errors=0):
+    return list(iter_match_phrases(files, phrases, threshold, phrase_index, max_errors))
+
+
+def iter_match_phrases(files, phrases, threshold=0.33, phrase_index=None, max_errors=0):
+    if phrase_index is None:
+        phrase_index = PhraseIndex.from_phrases(phrases)
     for file in files:
-        best_phrase, segments_data, best_cross_length = _match_phrase(file['subtitles'], phrases,
-                                                                      file["truePhraseId"])
-        if best_phrase:
-            new_subtitles = _create_new_subtitles(file['subtitles'], segments_data, best_phrase)
-            match_phrase_file_response = {
-                "subtitles": new_subtitles,
-                "id": file['id']
-            }
-            accuracy = min(best_cross_length / len(best_phrase.prepared_soundex), 1)
-            if best_cross_length < 8 and accuracy < threshold:
-                match_phrase_file_response = {
-                    "subtitles": [],
-                    "id": file['id']
-                }
-                match_phrase_response = {
-                    "file": match_phrase_file_response
-                }
-                results.append(match_phrase_response)
-            else:
-                match_phrase_response = {
-                    "file": match_phrase_file_response,
-                    "best_match": {
-                        "phrase_id": str(best_phrase.phrase_id),
-                        "accuracy": accuracy
-                    }
-                }
-                results.append(match_phrase_response)
-        else:
+        columns = subtitle_columns(file)
+        search_result = _search_phrase(columns[0], file["truePhraseId"], phrase_index, max_errors=max_errors)
+        yield _phrase_response(file, columns, search_result, phrase_index, threshold)
+
+
+def _phrase_response(file, columns, search_result, phrase_index, threshold):
+    texts, start_times, end_times = columns
+    best_candidate, segments_data, best_cross_length = search_result
+    best_phrase = phrase_index.phrases[best_candidate] if best_candidate >= 0 else None
+    if best_phrase:
+        new_subtitles = _create_new_subtitles(texts, start_times, end_times, segments_data, best_phrase)
+        match_phrase_file_response = {
+            "subtitles": new_subtitles,
+            "id": file['id']
+        }
+        accuracy = min(best_cross_length / len(best_phrase.prepared_soundex), 1)
+        if best_cross_length < 8 and accuracy < threshold:
             match_phrase_file_response = {
                 "subtitles": [],
                 "id": file['id']
@@ -75,22 +124,63 @@ def match_phrases(files, phrases, threshold=0.33):
             match_phrase_response = {
                 "file": match_phrase_file_response
             }
-            results.append(match_phrase_response)
-    return results
+            return match_phrase_response
+        match_phrase_response = {
+            "file": match_phrase_file_response,
+            "best_match": {
+                "phrase_id": str(best_phrase.phrase_id),
+                "accuracy": accuracy
+            }
+        }
+        return match_phrase_response
+    match_phrase_file_response = {
+        "subtitles": [],
+        "id": file['id']
+    }
+    match_phrase_response = {
+        "file": match_phrase_file_response
+    }
+    return match_phrase_response
 
 
-def _match_phrase(subtitles, phrases, truePhraseId):
-    sub_soundex = [soundex_transform(processed_text)
-                   for sub in subtitles
-                   if (processed_text := remove_punctuation(remove_enclosed_text(sub.text))) and
-                   has_russian_letters(processed_text)]
-    best_phrase = None
+def _match_phrase(texts, phrases, truePhraseId, phrase_index=None, prune=True, max_errors=0):
+    if phrase_index is None:
+        phrase_index = PhraseIndex.from_phrases(phrases)
+    best_candidate, best_segments, best_cross_length = _search_phrase(texts, truePhraseId, phrase_index, prune,
+                                                                      max_errors)
+    best_phrase = phrase_index.phrases[best_candidate] if best_candidate >= 0 else None
+    return best_phrase, best_segments, best_cross_length
+
+
+def _search_phrase(texts, truePhraseId, phrase_index, prune=True, max_errors=0):
+    with metrics.timed('candidate_filtering', items=1):
+        sub_soundex = phrase_index.encode(soundex_transform(processed_text)
+                                          for text in texts
+                                          if (processed_text := remove_punctuation(remove_enclosed_text(text))) and
+                                          has_russian_letters(processed_text))
+        ranked_candidates = phrase_index.ranked_candidates(sub_soundex)
+    with metrics.timed('scoring', items=1):
+        best_candidate, best_segments, best_cross_length, evaluated = _evaluate_candidates(
+            texts, truePhraseId, phrase_index, sub_soundex, ranked_candidates, prune, max_errors)
+    pruning_stats.record(len(ranked_candidates), evaluated)
+    return best_candidate, best_segments, best_cross_length
+
+
+def _evaluate_candidates(texts, truePhraseId, phrase_index, sub_soundex, ranked_candidates, prune, max_errors):
+    best_candidate = -1
     best_segments = []
     best_cross_length = 0
-
-    for phrase in phrases:
-        if len(phrase.prepared_soundex) == 0:
+    evaluated = 0
+    for bound, candidate in ranked_candidates:
+        # Кандидаты отсортированы по убыванию верхней оценки, при равной оценке побеждает меньший индекс,
+        # поэтому дальнейший перебор не может изменить результат.
+        if prune and (bound < best_cross_length or (bound == best_cross_length and candidate > best_candidate)):
+            if bound < best_cross_length:
+                break
             continue
+        evaluated += 1
+        phrase = phrase_index.phrases[candidate]
+        phrase_positions = phrase_index.positions(candidate)
         matches = []
         start_idx = 0
         phrase_end = -1
@@ -100,7 +190,8 @@ def _match_phrase(subtitles, phrases, truePhraseId):
         while start_idx < len(sub_soundex):
             segment_length, new_start, is_matching, phrase_start = _check_match(sub_soundex,
                                                                                 phrase.prepared_soundex,
-                                                                                start_idx)
+                                                                                start_idx,
+                                                                                phrase_positions)
             length = segment_length if is_matching else 0
             if segment_length > 0:
                 end_idx = start_idx + segment_length - 1
@@ -121,27 +212,58 @@ def _match_phrase(subtitles, phrases, truePhraseId):
                 matched_segment_end = end_idx
         if max_cross_length < cross_length:
             max_cross_length = cross_length
+        if max_errors > 0:
+            alignment = best_alignment(phrase.prepared_soundex, sub_soundex, max_errors)
+            if alignment is not None:
+                distance, aligned_start, aligned_end = alignment
+                aligned_length = common_length(phrase.prepared_soundex, sub_soundex[aligned_start:aligned_end + 1])
+                if aligned_length > max_cross_length:
+                    matches = _merge_alignment(matches, aligned_start, aligned_end, aligned_length)
+                    max_cross_length = aligned_length
         acc = (max_cross_length / len(phrase.prepared_soundex))
-        if truePhraseId == phrase.phrase_id and acc < 0.33 and max_cross_length < 8:
+        if metrics.DEBUG_DUMPS and truePhraseId == phrase.phrase_id and acc < 0.33 and max_cross_length < 8:
+            from icecream import ic
             segment_texts = []
             for start_idx, end_idx, match_count in matches:
-                segment_text = ''.join(sub.text for sub in subtitles[start_idx:end_idx + 1])
+                segment_text = ''.join(texts[start_idx:end_idx + 1])
                 segment_texts.append(f"[{match_count}] {segment_text}")
             ic(f"{acc:.2f} {max_cross_length} {len(phrase.prepared_soundex)}", segment_texts)
-        if len(matches) > 0 and max_cross_length > best_cross_length:
+        if len(matches) > 0 and max_cross_length > 0 and (
+                max_cross_length > best_cross_length or
+                (max_cross_length == best_cross_length and candidate < best_candidate)):
             best_cross_length = max_cross_length
-            best_phrase = phrase
+            best_candidate = candidate
             best_segments = matches
 
-    return best_phrase, best_segments, best_cross_length
+    return best_candidate, best_segments, best_cross_length, evaluated
+
+
+def _merge_alignment(matches, aligned_start, aligned_end, aligned_length):
+    merged = []
+    inserted = False
+    for start_idx, end_idx, length in matches:
+        if end_idx < aligned_start or start_idx > aligned_end:
+            merged.append((start_idx, end_idx, length))
+            continue
+        if start_idx < aligned_start:
+            merged.append((start_idx, aligned_start - 1, aligned_start - start_idx if length else 0))
+        if not inserted:
+            merged.append((aligned_start, aligned_end, aligned_length))
+            inserted = True
+        if end_idx > aligned_end:
+            merged.append((aligned_end + 1, end_idx, end_idx - aligned_end if length else 0))
+    return merged
 
 
-def _check_match(sub_soundex, phrase_soundex, start_idx):
+def _check_match(sub_soundex, phrase_soundex, start_idx, phrase_positions=None):
+    if phrase_positions is None:
+        phrase_positions = {}
+        for position, code in enumerate(phrase_soundex):
+            phrase_positions.setdefault(code, position)
     idx = start_idx
-    start = -1
-    if sub_soundex[idx] in phrase_soundex:
+    start = phrase_positions.get(sub_soundex[idx], -1)
+    if start >= 0:
         is_matching = True
-        start = phrase_soundex.index(sub_soundex[idx])
         length = 1
         while (start + length < len(phrase_soundex) and idx + length < len(sub_soundex) and
                sub_soundex[idx + length] == phrase_soundex[start + length]):
@@ -150,19 +272,19 @@ def _check_match(sub_soundex, phrase_soundex, start_idx):
     else:
         is_matching = False
         length = 1
-        while idx + length < len(sub_soundex) and sub_soundex[idx + length] not in phrase_soundex:
+        while idx + length < len(sub_soundex) and sub_soundex[idx + length] not in phrase_positions:
             length += 1
         new_start = idx + length
 
     return length, new_start, is_matching, start
 
 
-def _create_new_subtitles(subtitles, matches, phrase):
+def _create_new_subtitles(texts, start_times, end_times, matches, phrase):
     new_subtitles = []
     for start, end, length in matches:
-        combined_text = ' '.join(sub.text.strip() for sub in subtitles[start:end + 1])
-        combined_start_time = subtitles[start].start_time
-        combined_end_time = subtitles[end].end_time
+        combined_text = ' '.join(text.strip() for text in texts[start:end + 1])
+        combined_start_time = start_times[start]
+        combined_end_time = end_times[end]
         new_subtitles.append(Subtitle(text=combined_text,
                                       start_time=combined_start_time,
                                       end_time=combined_end_time,
@@ -0,0 +1,43 @@
+import math
+import multiprocessing
+import os
+
+from core import phrase_matcher
+from core.phrase_index import PhraseIndex
+
+PHRASE_MATCH_WORKERS = int(os.environ.get('PHRASE_MATCH_WORKERS', '0'))
+MIN_PARALLEL_FILES = 8
+CHUNKS_PER_WORKER = 4
+
+_phrase_index = None
+
+
+def _init_worker(phrase_index):
+    # При fork аргументы инициализатора не сериализуются: индекс фраз достаётся процессу из памяти родителя.
+    global _phrase_index
+    _phrase_index = phrase_index
+
+
+def _search_file(task):
+    texts, true_phrase_id, max_errors = task
+    return phrase_matcher._search_phrase(texts, true_phrase_id, _phrase_index, max_errors=max_errors)
+
+
+def iter_match_phrases_parallel(files, phrases, threshold=0.33, phrase_index=None, workers=None, max_errors=0):
+    if workers is None:
+        workers = PHRASE_MATCH_WORKERS
+    files = list(files)
+    if workers < 2 or len(files) < MIN_PARALLEL_FILES or 'fork' not in multiprocessing.get_all_start_methods():
+        yield from phrase_matcher.iter_match_phrases(files, phrases, threshold, phrase_index, max_errors)
+        return
+
+    if phrase_index is None:
+        phrase_index = PhraseIndex.from_phrases(phrases)
+    columns = [phrase_matcher.subtitle_columns(file) for file in files]
+    tasks = [(list(texts), file['truePhraseId'], max_errors) for file, (texts, _, _) in zip(files, columns)]
+    chunk_size = math.ceil(len(tasks) / (workers * CHUNKS_PER_WORKER))
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers, initializer=_init_worker, initargs=(phrase_index,)) as pool:
+        search_results = pool.imap(_search_file, tasks, chunk_size)
+        for file, file_columns, search_result in zip(files, columns, search_results):
+            yield phrase_matcher._phrase_response(file, file_columns, search_result, phrase_index, threshold)
@@ -0,0 +1,62 @@
+import json
+
+RESPONSE_BUFFER_SIZE = 64 * 1024
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_pretty_encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+
+
+def encode_subtitle(subtitle):
+    best_matches = subtitle.best_matches
+    return {
+        "text": subtitle.text,
+        "start_time": subtitle.start_time,
+        "end_time": subtitle.end_time,
+        "phrase_id": str(subtitle.phrase_id) if subtitle.phrase_id else "",
+        "match_accuracy": subtitle.match_accuracy,
+        "best_matches": [{"phrase_id": match.phrase.phrase_id, "matching_count": match.matching_count}
+                         for match in best_matches if match] if best_matches else ""
+    }
+
+
+def encode_phrase_result(result):
+    file = result["file"]
+    encoded = {
+        "file": {
+            "subtitles": [encode_subtitle(subtitle) for subtitle in file["subtitles"]],
+            "id": file["id"]
+        }
+    }
+    if "best_match" in result:
+        encoded["best_match"] = result["best_match"]
+    return encoded
+
+
+def encode_action_result(result):
+    return list(result)
+
+
+def encode_line(result, encode_item):
+    return _compact_encoder.encode(encode_item(result)) + '\n'
+
+
+def iter_json_array(results, encode_item, pretty=False, buffer_size=RESPONSE_BUFFER_SIZE):
+    encoder = _pretty_encoder if pretty else _compact_encoder
+    opening, separator, closing = ('[\n    ', ',\n    ', '\n]') if pretty else ('[', ',', ']')
+    buffer = []
+    buffered = 0
+    started = False
+    for result in results:
+        encoded = encoder.encode(encode_item(result))
+        if pretty:
+            encoded = encoded.replace('\n', '\n    ')
+        buffer.append(separator if started else opening)
+        buffer.append(encoded)
+        started = True
+        buffered += len(encoded)
+        if buffered >= buffer_size:
+            yield ''.join(buffer)
+            buffer = []
+            buffered = 0
+    buffer.append(closing if started else '[]')
+    yield ''.join(buffer)
@@ -0,0 +1,63 @@
+def pattern_masks(pattern):
+    masks = {}
+    for position, code in enumerate(pattern):
+        masks[code] = masks.get(code, 0) | (1 << position)
+    return masks
+
+
+def edit_distances(pattern, text, anchored=False):
+    """Битово-параллельный алгоритм Майерса: для каждой позиции текста возвращает
+    наименьшее редакционное расстояние между шаблоном и подстрокой текста, заканчивающейся в ней.
+    При anchored=True подстрока обязана начинаться с первой позиции текста."""
+    length = len(pattern)
+    masks = pattern_masks(pattern)
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    carry = 1 if anchored else 0
+    positive, negative = mask, 0
+    score = length
+    for code in text:
+        equal = masks.get(code, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & mask)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & high:
+            score += 1
+        elif horizontal_negative & high:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | carry) & mask
+        horizontal_negative = (horizontal_negative << 1) & mask
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & mask)
+        negative = horizontal_positive & vertical
+        yield score
+
+
+def best_alignment(pattern, text, max_errors):
+    """Возвращает (distance, start, end) лучшего вхождения шаблона в текст с не более чем
+    max_errors вставками, удалениями и заменами или None."""
+    if not pattern or not text:
+        return None
+    best_distance, best_end = len(pattern) + 1, -1
+    for end, distance in enumerate(edit_distances(pattern, text)):
+        if distance <= best_distance:
+            best_distance, best_end = distance, end
+    if best_distance > max_errors:
+        return None
+    # Из равноценных вхождений выбирается самое широкое: оно покрывает больше слов фразы.
+    best_start = best_end
+    for offset, distance in enumerate(edit_distances(pattern[::-1], text[best_end::-1], anchored=True)):
+        if distance == best_distance:
+            best_start = best_end - offset
+    return best_distance, best_start, best_end
+
+
+def common_length(pattern, text):
+    """Длина наибольшей общей подпоследовательности, вычисляемая битово-параллельно."""
+    masks = pattern_masks(pattern)
+    mask = (1 << len(pattern)) - 1
+    vector = mask
+    for code in text:
+        matched = vector & masks.get(code, 0)
+        vector = ((vector + matched) | (vector - matched)) & mask
+    return len(pattern) - bin(vector).count('1')
@@ -0,0 +1,11 @@
+import pytest
+
+from core import lemmatizer
+
+
+@pytest.fixture(scope='session')
+def nlp_models():
+    try:
+        lemmatizer.warm_up()
+    except LookupError as e:
+        pytest.skip(str(e))
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+from core.actions_corpus import ActionsCorpus
+from project.Action import Action
+
+CLASSES = ['day', 'night', 'kitchen', 'car', 'person', 'door', 'beep', 'train', 'port', 'nature', 'interior',
+           'moving furniture', 'hockey stop', 'cutting pineapple', '2 person', '3 person']
+EXCLUDED_CLASSES = ['day', 'night', 'kitchen']
+
+
+def _action(rng, action_id, last_update=1):
+    classes = rng.sample(CLASSES, rng.randint(0, 6))
+    return Action(action_id, '', last_update, classification=(classes, {}, {}))
+
+
+def _queries(rng, count=30):
+    return [rng.sample(CLASSES, rng.randint(1, 6)) for _ in range(count)]
+
+
+def _revise(rng, actions, step):
+    actions = [action for action in actions if rng.random() > 0.1]
+    for index in rng.sample(range(len(actions)), len(actions) // 5):
+        actions[index] = _action(rng, actions[index].action_id, actions[index].last_update + 1)
+    actions += [_action(rng, f"n{step}-{index}") for index in range(rng.randint(0, 10))]
+    rng.shuffle(actions)
+    return actions
+
+
+def _assert_same_results(corpus, rebuilt, queries):
+    assert [action.action_id for action in corpus.actions] == [action.action_id for action in rebuilt.actions]
+    assert corpus.idf == pytest.approx(rebuilt.idf)
+    np.testing.assert_allclose(corpus.similarities(queries), rebuilt.similarities(queries), atol=1e-12)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_update_matches_full_rebuild(seed):
+    rng = random.Random(seed)
+    actions = [_action(rng, f"a{index}") for index in range(80)]
+    corpus = ActionsCorpus(actions, excluded_classes=EXCLUDED_CLASSES)
+    queries = _queries(rng)
+
+    for step in range(6):
+        previous_actions = actions
+        previous = corpus.copy()
+        actions = _revise(rng, actions, step)
+        corpus.update(actions)
+
+        _assert_same_results(corpus, ActionsCorpus(actions, excluded_classes=EXCLUDED_CLASSES), queries)
+        # Копия, с которой работал предыдущий ScriptFile, не должна меняться при обновлении.
+        _assert_same_results(previous, ActionsCorpus(previous_actions, excluded_classes=EXCLUDED_CLASSES), queries)
+
+
+def test_update_to_empty_and_back():
+    rng = random.Random(0)
+    actions = [_action(rng, f"a{index}") for index in range(10)]
+    corpus = ActionsCorpus(actions)
+
+    corpus.update([])
+    assert corpus.similarities(_queries(rng, 3)).shape == (3, 0)
+
+    corpus.update(actions)
+    queries = _queries(rng)
+    _assert_same_results(corpus, ActionsCorpus(actions), queries)
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.generators import generate_script
+from core.classification_pool import MIN_PARALLEL_TEXTS, classify_texts_parallel
+
+
+def _normalized(classifications):
+    return [(sorted(classes), dict(counts), dict(unused)) for classes, counts, unused in classifications]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_parallel_classification_matches_serial(nlp_models, seed):
+    script = generate_script(seed, phrases_count=0, actions_count=MIN_PARALLEL_TEXTS * 3)
+    texts = [action["text"] for action in script["actions"]]
+
+    serial = classify_texts_parallel(texts, script["character_names"], workers=0)
+    parallel = classify_texts_parallel(texts, script["character_names"], workers=3)
+
+    assert _normalized(parallel) == _normalized(serial)
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from benchmarks.generators import generate_words
+from benchmarks.phrase_pruning import generate_take
+from core import phrase_matcher
+from core.json_encoder import object_to_json
+from core.phrase_index import PhraseIndex, SoundexVocabulary
+from project.Phrase import Phrase
+from project.Subtitle import Subtitle
+
+
+def _script(rng, words, phrases_count):
+    vocabulary = SoundexVocabulary()
+    phrases = [Phrase(phrase_id=str(phrase_id), text='',
+                      phrase_text=' '.join(rng.choice(words) for _ in range(rng.randint(1, 15))),
+                      vocabulary=vocabulary)
+               for phrase_id in range(phrases_count)]
+    return phrases, PhraseIndex(phrases, vocabulary)
+
+
+@pytest.mark.parametrize('max_errors', [0, 2])
+@pytest.mark.parametrize('seed', range(3))
+def test_pruned_search_matches_exhaustive(seed, max_errors):
+    rng = random.Random(seed)
+    # Маленький словарь даёт много фраз с равной оценкой и проверяет выбор при равенстве.
+    words = generate_words(rng, 40)
+    phrases, phrase_index = _script(rng, words, 300)
+
+    for _ in range(60):
+        texts = generate_take(rng, words, phrases, noise=0.3)
+        pruned = phrase_matcher._match_phrase(texts, phrases, None, phrase_index, prune=True, max_errors=max_errors)
+        exhaustive = phrase_matcher._match_phrase(texts, phrases, None, phrase_index, prune=False,
+                                                  max_errors=max_errors)
+        assert pruned == exhaustive
+
+
+def test_match_phrases_without_shared_vocabulary():
+    texts = ['привет', 'мир', 'пока']
+    files = [{"id": "f", "truePhraseId": None,
+              "subtitles": [Subtitle(text=text, start_time=float(index), end_time=float(index + 1))
+                            for index, text in enumerate(texts)]}]
+    vocabulary = SoundexVocabulary()
+    shared = [Phrase('1', '', 'привет мир', vocabulary=vocabulary), Phrase('2', '', 'пока мир', vocabulary=vocabulary)]
+    separate = [Phrase('1', '', 'привет мир'), Phrase('2', '', 'пока мир')]
+
+    expected = object_to_json(phrase_matcher.match_phrases(files, shared, phrase_index=PhraseIndex(shared, vocabulary)))
+
+    assert object_to_json(phrase_matcher.match_phrases(files, separate)) == expected
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from benchmarks.generators import FILLER_WORDS
+from core import text_classifier
+from core.classifier_artifact import OBJECT, build_keyword_index, category_paths, load_synonyms_file
+
+
+def _source_dicts():
+    return {category: load_synonyms_file(path)[0] for category, path in category_paths().items()}
+
+
+def _mutated_keyword_index(character_tokens):
+    # Прежнее поведение: имена персонажей дописывались в общий словарь объектов как класс person.
+    dicts = _source_dicts()
+    for token in character_tokens:
+        dicts[OBJECT][token] = text_classifier.PERSON
+    return build_keyword_index(dicts)
+
+
+def _normalized(classification):
+    classes, counts, unused = classification
+    return sorted(classes), dict(counts), dict(unused)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_character_overlay_matches_dictionary_mutation(monkeypatch, seed):
+    rng = random.Random(seed)
+    dicts = _source_dicts()
+    keyword_words = sorted({word for data_dict in dicts.values() for key in data_dict for word in key.split()})
+    single_word_objects = sorted(key for key in dicts[OBJECT] if ' ' not in key)
+    # Часть имён совпадает с синонимами объектов, чтобы проверить замену ключа словаря.
+    character_overlay = frozenset(rng.sample(single_word_objects, 5) + rng.sample(keyword_words, 5) +
+                                  ['иван', 'мария', 'годунов'])
+    token_lists = [[rng.choice(keyword_words) for _ in range(rng.randint(1, 8))] +
+                   [rng.choice(sorted(character_overlay)) for _ in range(rng.randint(0, 3))] +
+                   [rng.choice(FILLER_WORDS) for _ in range(rng.randint(0, 4))]
+                   for _ in range(300)]
+
+    with_overlay = [text_classifier.classify_text('', tokens, character_overlay) for tokens in token_lists]
+    without_overlay = [text_classifier.classify_text('', tokens) for tokens in token_lists]
+
+    monkeypatch.setattr(text_classifier, 'keyword_index', _mutated_keyword_index(character_overlay))
+    with_mutation = [text_classifier.classify_text('', tokens) for tokens in token_lists]
+    monkeypatch.setattr(text_classifier, 'keyword_index', _mutated_keyword_index(()))
+    with_sources = [text_classifier.classify_text('', tokens) for tokens in token_lists]
+
+    assert list(map(_normalized, with_overlay)) == list(map(_normalized, with_mutation))
+    # Без наложения классификация совпадает с исходными словарями: имена одного проекта не просачиваются в другой.
+    assert list(map(_normalized, without_overlay)) == list(map(_normalized, with_sources))
@@ -1,26 +1,9 @@
 import re
-import ssl
-import string
 from collections import defaultdict
-from time import time
 
-import nltk
-from icecream import ic, icecream
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from pymorphy2 import MorphAnalyzer
-
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-nltk.download('punkt')
-nltk.download('stopwords')
-
-morph = MorphAnalyzer()
+from core import metrics
+from core.classifier_artifact import ACTION, AUDIO, DAYTIME, LOCATION, OBJECT, load_keyword_index
+from core.lemmatizer import process_text, process_texts
 
 
 def read_words_from_file(file_path):
@@ -34,42 +17,57 @@ def read_words_from_file(file_path):
         return []
 
 
-def load_dict_from_file(filename):
-    data_dict = {}
-    with open(filename, 'r', encoding='utf-8') as file:
-        for line in file:
-            class_name, keywords = line.strip().split(': ')
-            for keyword in keywords.split(', '):
-                if keyword in data_dict:
-                    print('CONFLICT', keyword, class_name, data_dict[keyword])
-                data_dict[keyword] = class_name
-    return data_dict
+natures = read_words_from_file("core/classes/natures.txt")
+interiors = read_words_from_file("core/classes/interiors.txt")
 
+PERSON = 'person'
 
-object_classes_dict = load_dict_from_file('core/classes_data/objects_classes_synonyms.txt')
-location_classes_dict = load_dict_from_file('core/classes_data/location_classes_synonyms.txt')
-audio_classes_dict = load_dict_from_file('core/classes_data/audio_classes_synonyms.txt')
-action_classes_dict = load_dict_from_file('core/classes_data/action_classes_synonyms.txt')
-daytime_classes_dict = load_dict_from_file('core/classes_data/daytime_classes_synonyms.txt')
+keyword_index = load_keyword_index()
 
-natures = read_words_from_file("core/classes/natures.txt")
-interiors = read_words_from_file("core/classes/interiors.txt")
+
+def build_character_overlay(character_names):
+    character_tokens = set()
+    if metrics.DEBUG_DUMPS:
+        from icecream import ic
+        ic(character_names)
+    for name in character_names:
+        character_tokens.update(process_text(name))
+    return frozenset(character_tokens)
+
+
+def find_keyword_matches(tokens, character_overlay=frozenset()):
+    token_set = set(tokens)
+    matches = defaultdict(list)
+    for token in token_set:
+        for category, key, class_name, key_words in keyword_index.get(token, ()):
+            # Имя персонажа проекта заменяет одноимённый ключ общего словаря объектов.
+            if category == OBJECT and key in character_overlay:
+                continue
+            if key_words <= token_set:
+                matches[category].append((class_name, key, key_words))
+        if token in character_overlay:
+            matches[OBJECT].append((PERSON, token, frozenset((token,))))
+    return matches
 
 
-def classify_object(tokens):
+def _category_matches(tokens, category, matches):
+    if matches is None:
+        matches = find_keyword_matches(tokens)
+    return matches.get(category, ())
+
+
+def classify_object(tokens, matches=None):
     classes_synonyms_counts = defaultdict(int)
     counted_classes = {}
     used_words = set()
 
-    for key, class_name in object_classes_dict.items():
-        key_words = set(key.split())
-        if key_words.issubset(tokens):
-            classes_synonyms_counts[(class_name, key)] += 1
-            if class_name in counted_classes:
-                counted_classes[class_name] += 1
-            else:
-                counted_classes[class_name] = 1
-            used_words.update(key_words)
+    for class_name, key, key_words in _category_matches(tokens, OBJECT, matches):
+        classes_synonyms_counts[(class_name, key)] += 1
+        if class_name in counted_classes:
+            counted_classes[class_name] += 1
+        else:
+            counted_classes[class_name] = 1
+        used_words.update(key_words)
 
     classes = set()
     for class_name, count in counted_classes.items():
@@ -80,8 +78,9 @@ def classify_object(tokens):
     return classes, classes_synonyms_counts, used_words
 
 
-def classify_location(tokens):
-    classes, classes_synonyms_counts, used_words = _classify_from_dict(tokens, location_classes_dict)
+def classify_location(tokens, matches=None):
+    classes, classes_synonyms_counts, used_words = _classify_from_matches(
+        _category_matches(tokens, LOCATION, matches))
     for class_name in list(classes):
         if class_name in natures:
             classes.add('nature')
@@ -90,16 +89,17 @@ def classify_location(tokens):
     return classes, classes_synonyms_counts, used_words
 
 
-def classify_audio(tokens):
-    return _classify_from_dict(tokens, audio_classes_dict)
+def classify_audio(tokens, matches=None):
+    return _classify_from_matches(_category_matches(tokens, AUDIO, matches))
 
 
-def classify_action(tokens):
-    return _classify_from_dict(tokens, action_classes_dict)
+def classify_action(tokens, matches=None):
+    return _classify_from_matches(_category_matches(tokens, ACTION, matches))
 
 
-def classify_daytime(tokens, text):
-    classes, classes_synonyms_counts, used_words = _classify_from_dict(tokens, daytime_classes_dict)
+def classify_daytime(tokens, text, matches=None):
+    classes, classes_synonyms_counts, used_words = _classify_from_matches(
+        _category_matches(tokens, DAYTIME, matches))
 
     time_matches = re.findall(r'\b(?:[01]?\d|2[0-3]):[0-5]\d\b', text)
 
@@ -117,53 +117,39 @@ def classify_daytime(tokens, text):
     return classes, classes_synonyms_counts, used_words
 
 
-def _classify_from_dict(tokens, classes_dict):
+def _classify_from_matches(matches):
     classes = set()
     classes_synonyms_counts = defaultdict(int)
     used_words = set()
 
-    for key, class_name in classes_dict.items():
-        key_words = set(key.split())
-        if key_words.issubset(tokens):
-            classes.add(class_name)
-            classes_synonyms_counts[(class_name, key)] += 1
-            used_words.update(key_words)
+    for class_name, key, key_words in matches:
+        classes.add(class_name)
+        classes_synonyms_counts[(class_name, key)] += 1
+        used_words.update(key_words)
 
     return classes, classes_synonyms_counts, used_words
 
 
-def process_text(text):
-    text_nopunct = ''.join([char for char in text if char not in string.punctuation])
-    tokens = word_tokenize(text_nopunct, language='russian')
-    filtered_tokens = [word for word in tokens if word.lower() not in stopwords.words('russian')]
-    lemmatized_tokens = [morph.parse(word)[0].normal_form for word in filtered_tokens]
-    return lemmatized_tokens
-
-
-def add_character_names_to_dict(character_names):
-    character_tokens = set()
-    icecream.ic(character_names)
-    for name in character_names:
-        character_tokens.update(process_text(name))
+def classify_text(full_text, tokens=None, character_overlay=frozenset()):
+    if tokens is None:
+        tokens = process_text(full_text)
+    with metrics.timed('classification', items=1):
+        return _classify_tokens(full_text, tokens, character_overlay)
 
-    for token in character_tokens:
-        object_classes_dict[token] = 'person'
 
-
-def classify_text(full_text):
-    start_time = time()
-    tokens = process_text(full_text)
+def _classify_tokens(full_text, tokens, character_overlay):
+    matches = find_keyword_matches(tokens, character_overlay)
 
     classes = set()
     classes_synonyms_counts = defaultdict(int)
     all_used_words = set()
 
     classification_functions = [
-        (classify_object, (tokens,)),
-        (classify_location, (tokens,)),
-        (classify_audio, (tokens,)),
-        (classify_action, (tokens,)),
-        (classify_daytime, (tokens, full_text)),
+        (classify_object, (tokens, matches)),
+        (classify_location, (tokens, matches)),
+        (classify_audio, (tokens, matches)),
+        (classify_action, (tokens, matches)),
+        (classify_daytime, (tokens, full_text, matches)),
     ]
 
     for func, args in classification_functions:
@@ -174,11 +160,14 @@ def classify_text(full_text):
         all_used_words.update(result_used_words)
 
     unused_words_counts = defaultdict(int)
-    used_words_list = list(all_used_words)
     for token in tokens:
-        if token not in used_words_list:
+        if token not in all_used_words:
             unused_words_counts[token] += 1
-    ic(full_text, tokens, classes)
-    end_time = time()
-    print(f"Action processed in {end_time - start_time} seconds.")
+    if metrics.DEBUG_DUMPS:
+        from icecream import ic
+        ic(full_text, tokens, classes)
     return list(classes), classes_synonyms_counts, unused_words_counts
+
+
+def classify_texts(texts, character_overlay=frozenset()):
+    return [classify_text(text, tokens, character_overlay) for text, tokens in zip(texts, process_texts(texts))]
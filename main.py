@@ -1,70 +1,191 @@
+import gzip
 import json
+from time import perf_counter
 
-from flask import Flask, request, jsonify
-from icecream import icecream
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 
-from core.actions_matcher import match_actions
-from core.json_encoder import object_to_json
-from core.phrase_matcher import match_phrases
-from project.RoughCutProject import projects_storage, RoughCutProject
-from project.ScriptFile import ScriptFile
+from core import lemmatizer, metrics
+from core.match_cache import iter_cached_match_actions, iter_cached_match_phrases
+from core.phrase_matcher import PHRASE_MAX_ERRORS, pruning_stats
+from core.response_encoder import encode_action_result, encode_line, encode_phrase_result, iter_json_array
+from project.RoughCutProject import projects_storage
+from project.ScriptIngestion import get_job, ingest_script, submit_ingestion
 from project.Subtitle import Subtitle
 
 app = Flask(__name__)
 
+METRICS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
-def create_project_if_not_exists(project_id):
-    if project_id not in projects_storage:
-        projects_storage[project_id] = RoughCutProject()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = perf_counter()
+
+
+@app.after_request
+def observe_request_latency(response):
+    if 'request_start' in g:
+        start = g.request_start
+        labels = (request.url_rule.rule if request.url_rule else 'unknown', request.method, response.status_code)
+        # Потоковые ответы сопоставляют и сериализуют результаты уже после выхода из обработчика,
+        # поэтому время фиксируется, когда сервер закрывает ответ.
+        response.call_on_close(lambda: metrics.request_seconds.observe(perf_counter() - start, *labels))
+    return response
+
+
+def read_json_body():
+    if request.content_encoding == 'gzip':
+        return json.loads(gzip.decompress(request.get_data()))
+    return request.json
+
+
+def script_not_found_response():
+    return jsonify({'message': 'Сценарий не найден'}), 404
 
 
 @app.route('/script', methods=['POST'])
 def upload_script():
-    data = request.json
+    data = read_json_body()
     project_id = data['project_id']
-    create_project_if_not_exists(project_id)
-    if projects_storage[project_id].script_file is not None:
-        script_file = projects_storage[project_id].script_file
-        script_file.update(script_id=data['script_id'], file_path=data['file_path'], phrases=data['phrases'],
-                           actions=data['actions'], character_names=data['character_names'])
-        app.logger.info(f'Сценарий обновлён ${script_file}')
-    else:
-        script_file = ScriptFile(script_id=data['script_id'], file_path=data['file_path'], phrases=data['phrases'],
-                                 actions=data['actions'], character_names=data['character_names'])
-        projects_storage[project_id].script_file = script_file
-        app.logger.info(f'Сценарий загружен ${script_file}')
+    if data.get('async'):
+        job = submit_ingestion(project_id, data)
+        app.logger.info(f'Загрузка сценария поставлена в очередь ${job.job_id}')
+        return jsonify(job.to_json()), 202
+    script_file = ingest_script(project_id, data)
+    app.logger.info(f'Сценарий загружен ${script_file}')
     return jsonify(
         {'message': 'Сценарий загружен'}), 200
 
 
-@app.route('/matchPhrases', methods=['POST'])
-def match_phrases_handler():
-    data = request.json
-    project_id = data['project_id']
-    create_project_if_not_exists(project_id)
-    files = data['files']
+@app.route('/scriptJobs/<job_id>', methods=['GET'])
+def script_job_handler(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'message': 'Задача не найдена'}), 404
+    return jsonify(job.to_json()), 200
+
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_ACTIONS_CHUNK_SIZE = 32
+
+
+def is_streaming_requested(data):
+    return bool(data.get('stream')) or request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def is_pretty_requested(data):
+    return bool(data.get('pretty'))
+
+
+def ndjson_response(results, encode_item):
+    def generate():
+        for result in results:
+            with metrics.timed('serialisation', items=1):
+                line = encode_line(result, encode_item)
+            yield line
+
+    return Response(stream_with_context(generate()), status=201, mimetype=NDJSON_MIMETYPE)
+
+
+def json_array_response(results, encode_item, pretty=False):
+    def generate():
+        chunks = iter_json_array(results, encode_item, pretty)
+        while True:
+            with metrics.timed('serialisation'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    return Response(generate(), status=201, mimetype=JSON_MIMETYPE)
+
+
+def prepare_phrase_files(files):
     for file in files:
         if 'subtitles' in file:
             file['subtitles'] = [Subtitle.from_dict(subtitle) for subtitle in file['subtitles']]
-    result = match_phrases(files, projects_storage[project_id].script_file.phrases)
-    converted_data = object_to_json(result)
-    json_string = json.dumps(converted_data, ensure_ascii=False, indent=4)
-    return json_string, 201
+        yield file
+
+
+@app.route('/matchPhrases', methods=['POST'])
+def match_phrases_handler():
+    data = read_json_body()
+    project = projects_storage.get(data['project_id'])
+    if project is None or project.script_file is None:
+        return script_not_found_response()
+    files = prepare_phrase_files(data['files'])
+    max_errors = int(data.get('max_errors', PHRASE_MAX_ERRORS))
+    results = iter_cached_match_phrases(files, project.script_file, project.results_cache, max_errors=max_errors)
+    if is_streaming_requested(data):
+        return ndjson_response(results, encode_phrase_result)
+    return json_array_response(list(results), encode_phrase_result, is_pretty_requested(data))
 
 
 @app.route('/matchActions', methods=['POST'])
 def match_actions_handler():
-    data = request.json
-    project_id = data['project_id']
-    create_project_if_not_exists(project_id)
+    data = read_json_body()
+    project = projects_storage.get(data['project_id'])
+    if project is None or project.script_file is None:
+        return script_not_found_response()
     files = data['files']
-    script_file = projects_storage[project_id].script_file
-    result = match_actions(files, script_file.actions, script_file.idf_corpus)
-    converted_data = object_to_json(result)
-    icecream.ic(converted_data)
-    json_string = json.dumps(converted_data, ensure_ascii=False, indent=4)
-    return json_string, 201
+    if is_streaming_requested(data):
+        return ndjson_response(iter_cached_match_actions(files, project.script_file, project.results_cache,
+                                                         chunk_size=STREAM_ACTIONS_CHUNK_SIZE),
+                               encode_action_result)
+    result = list(iter_cached_match_actions(files, project.script_file, project.results_cache))
+    if metrics.DEBUG_DUMPS:
+        from icecream import ic
+        ic(result)
+    return json_array_response(result, encode_action_result, is_pretty_requested(data))
+
+
+@app.route('/classesStatistics', methods=['GET'])
+def classes_statistics_handler():
+    project = projects_storage.get(request.args['project_id'])
+    if project is None or project.script_file is None:
+        return script_not_found_response()
+    return jsonify(project.script_file.statistics.to_json()), 200
+
+
+@app.route('/matchCache', methods=['GET'])
+def match_cache_handler():
+    project = projects_storage.get(request.args['project_id'])
+    if project is None:
+        return jsonify({'message': 'Проект не найден'}), 404
+    return jsonify(project.results_cache.stats()), 200
+
+
+@app.route('/projectsCache', methods=['GET'])
+def projects_cache_handler():
+    return jsonify(projects_storage.stats()), 200
+
+
+def _fields(stats):
+    return {(field,): value for field, value in stats.items() if isinstance(value, (int, float))}
+
+
+metrics.registry.gauge('clapper_lemma_cache', 'Состояние кэша лемм.',
+                       lambda: _fields(lemmatizer.lemma_cache_info()._asdict()), ('field',))
+metrics.registry.gauge('clapper_projects_cache', 'Состояние кэша проектов в памяти.',
+                       lambda: _fields(projects_storage.stats()), ('field',))
+metrics.registry.gauge('clapper_phrase_pruning', 'Отсечение кандидатов при поиске фраз.',
+                       lambda: _fields(pruning_stats.to_json()), ('field',))
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_handler():
+    return Response(metrics.registry.render(), content_type=METRICS_MIMETYPE)
+
+
+def warm_up():
+    lemmatizer.warm_up()
+
+
+def create_app():
+    warm_up()
+    return app
 
 
 if __name__ == '__main__':
-    app.run(debug=False)
+    create_app().run(debug=False)
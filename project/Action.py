@@ -2,14 +2,17 @@ from core import text_classifier
 
 
 class Action:
-    def __init__(self, action_id, text, last_update):
+    def __init__(self, action_id, text, last_update, classification=None):
         self.action_id = action_id
         self.full_text = text
         self.last_update = last_update
         self.classes = []
         self.counts = {}
         self.unused = {}
-        self.process_text()
+        if classification is None:
+            self.process_text()
+        else:
+            self.classes, self.counts, self.unused = classification
 
     def to_json(self):
         return {
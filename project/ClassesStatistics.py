@@ -0,0 +1,71 @@
+import csv
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+STATS_DIRECTORY = 'stats'
+
+export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stats-export')
+
+
+class ClassesStatistics:
+    def __init__(self, actions=()):
+        self.classes = Counter()
+        self.counts = Counter()
+        self.unused_words = Counter()
+        for action in actions:
+            self.add(action)
+
+    def add(self, action):
+        self.classes.update(action.classes)
+        self.counts.update(action.counts)
+        self.unused_words.update(action.unused)
+
+    def remove(self, action):
+        _subtract(self.classes, Counter(action.classes))
+        _subtract(self.counts, action.counts)
+        _subtract(self.unused_words, action.unused)
+
+    def to_json(self):
+        return {
+            "classes": [{"class": cls, "frequency": frequency}
+                        for cls, frequency in self.classes.most_common()],
+            "counts": [{"class_name": class_name, "key": key, "count": count}
+                       for (class_name, key), count in self.counts.most_common()],
+            "unused_words": [{"word": word, "count": count}
+                             for word, count in self.unused_words.most_common()],
+        }
+
+    def export_csv(self, script_id, directory=STATS_DIRECTORY):
+        os.makedirs(directory, exist_ok=True)
+        _write_csv(f"{directory}/{script_id}_class_statistics.csv", ['Class', 'Frequency'],
+                   self.classes.most_common())
+        _write_csv(f"{directory}/{script_id}_counts_statistics.csv", ['Class_Name', 'Key', 'Count'],
+                   [(class_name, key, count) for (class_name, key), count in self.counts.most_common()])
+        _write_csv(f"{directory}/{script_id}_unused_words_statistics.csv", ['Word', 'Count'],
+                   self.unused_words.most_common())
+        print(f"Statistics for script {script_id} saved to {directory}")
+
+    def copy(self):
+        statistics = ClassesStatistics()
+        statistics.classes = self.classes.copy()
+        statistics.counts = self.counts.copy()
+        statistics.unused_words = self.unused_words.copy()
+        return statistics
+
+    def export_csv_async(self, script_id, directory=STATS_DIRECTORY):
+        return export_executor.submit(self.copy().export_csv, script_id, directory)
+
+
+def _subtract(counter, values):
+    for key, count in values.items():
+        counter[key] -= count
+        if counter[key] <= 0:
+            del counter[key]
+
+
+def _write_csv(filename, header, rows):
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
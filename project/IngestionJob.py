@@ -0,0 +1,77 @@
+import threading
+import uuid
+from contextlib import contextmanager
+from time import time
+
+
+class IngestionProgress:
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def set_total(self, total):
+        pass
+
+    def advance(self, count):
+        pass
+
+
+class IngestionJob(IngestionProgress):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, project_id):
+        self.job_id = uuid.uuid4().hex
+        self.project_id = project_id
+        self.status = IngestionJob.QUEUED
+        self.processed = 0
+        self.total = 0
+        self.stage_timings = {}
+        self.current_stage = None
+        self.error = None
+        self.created_at = time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        self.current_stage = name
+        start_time = time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stage_timings[name] = self.stage_timings.get(name, 0) + time() - start_time
+                self.current_stage = None
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+            self.processed = 0
+
+    def advance(self, count):
+        with self._lock:
+            self.processed += count
+
+    def start(self):
+        self.status = IngestionJob.RUNNING
+
+    def finish(self, error=None):
+        self.error = error
+        self.status = IngestionJob.FAILED if error else IngestionJob.DONE
+        self.finished_at = time()
+
+    def to_json(self):
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "project_id": self.project_id,
+                "status": self.status,
+                "stage": self.current_stage,
+                "processed": self.processed,
+                "total": self.total,
+                "stage_timings": dict(self.stage_timings),
+                "error": self.error,
+            }
@@ -1,18 +1,20 @@
 import core
+from core.phrase_index import SoundexVocabulary
 
 
 class Phrase:
-    def __init__(self, phrase_id, text, phrase_text=""):
+    def __init__(self, phrase_id, text, phrase_text="", vocabulary=None):
         self.phrase_id = phrase_id
         self.full_text = text
         self.phrase_text = phrase_text
+        self.vocabulary = vocabulary if vocabulary is not None else SoundexVocabulary()
         self.prepared_soundex, self.words_count = self.prepare()
 
     def prepare(self):
         text = self.phrase_text.lower()
         text = core.phrase_matcher.remove_enclosed_text(text)
         words = core.phrase_matcher.remove_punctuation(text).split()
-        soundex_array = [core.phrase_matcher.soundex_transform(word) for word in words]
+        soundex_array = self.vocabulary.intern_all(core.phrase_matcher.soundex_transform(word) for word in words)
         return soundex_array, len(words)
 
     def to_json(self):
@@ -0,0 +1,68 @@
+import os
+import pickle
+import sqlite3
+import threading
+
+STORAGE_FORMAT_VERSION = 7
+
+
+class MemoryProjectStore:
+    persistent = False
+
+    def load(self, project_id):
+        return None
+
+    def save(self, project_id, project):
+        pass
+
+    def delete(self, project_id):
+        pass
+
+
+class SqliteProjectStore:
+    persistent = True
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS projects ('
+                                     'project_id TEXT PRIMARY KEY, '
+                                     'format_version INTEGER NOT NULL, '
+                                     'data BLOB NOT NULL)')
+
+    def load(self, project_id):
+        with self._lock:
+            row = self._connection.execute('SELECT format_version, data FROM projects WHERE project_id = ?',
+                                           (str(project_id),)).fetchone()
+        if row is None:
+            return None
+        format_version, data = row
+        if format_version != STORAGE_FORMAT_VERSION:
+            print(f"Проект '{project_id}' сохранён в устаревшем формате {format_version}, пропускаем.")
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            print(f"Не удалось загрузить проект '{project_id}': {e}")
+            return None
+
+    def save(self, project_id, project):
+        data = pickle.dumps(project, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO projects (project_id, format_version, data) '
+                                     'VALUES (?, ?, ?)', (str(project_id), STORAGE_FORMAT_VERSION, data))
+
+    def delete(self, project_id):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM projects WHERE project_id = ?', (str(project_id),))
+
+
+def create_project_store(path):
+    if not path:
+        return MemoryProjectStore()
+    return SqliteProjectStore(path)
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+
+
+class ProjectsStorage:
+    def __init__(self, store, max_projects=0):
+        self.store = store
+        self.max_projects = max_projects
+        self.projects = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, project_id):
+        return self._load(project_id) is not None
+
+    def __getitem__(self, project_id):
+        project = self._load(project_id)
+        if project is None:
+            raise KeyError(project_id)
+        return project
+
+    def get(self, project_id, default=None):
+        project = self._load(project_id)
+        return default if project is None else project
+
+    def __setitem__(self, project_id, project):
+        self.store.save(project_id, project)
+        with self._lock:
+            self._cache(project_id, project)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self.projects),
+                "max_projects": self.max_projects,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _load(self, project_id):
+        with self._lock:
+            project = self.projects.get(project_id)
+            if project is not None:
+                self.hits += 1
+                self.projects.move_to_end(project_id)
+                return project
+            self.misses += 1
+        # Чтение и распаковка проекта идут без блокировки, чтобы не задерживать обращения к другим проектам.
+        project = self.store.load(project_id)
+        if project is None:
+            return None
+        with self._lock:
+            cached = self.projects.get(project_id)
+            if cached is not None:
+                self.projects.move_to_end(project_id)
+                return cached
+            self._cache(project_id, project)
+            return project
+
+    def _cache(self, project_id, project):
+        self.projects[project_id] = project
+        self.projects.move_to_end(project_id)
+        if not self.max_projects or not self.store.persistent:
+            return
+        while len(self.projects) > self.max_projects:
+            self.projects.popitem(last=False)
+            self.evictions += 1
@@ -1,6 +1,27 @@
+import os
+
+from core.match_cache import MatchResultsCache
+from project.ProjectStore import create_project_store
+from project.ProjectsStorage import ProjectsStorage
+
+PROJECTS_STORAGE_PATH = os.environ.get('PROJECTS_STORAGE_PATH', 'storage/projects.sqlite3')
+PROJECTS_CACHE_SIZE = int(os.environ.get('PROJECTS_CACHE_SIZE', '32'))
+MATCH_CACHE_SIZE = int(os.environ.get('MATCH_CACHE_SIZE', '4096'))
+
+
 class RoughCutProject:
     def __init__(self):
         self.script_file = None
+        self.results_cache = MatchResultsCache(MATCH_CACHE_SIZE)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['results_cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.results_cache = MatchResultsCache(MATCH_CACHE_SIZE)
 
 
-projects_storage = {}
+projects_storage = ProjectsStorage(create_project_store(PROJECTS_STORAGE_PATH), PROJECTS_CACHE_SIZE)
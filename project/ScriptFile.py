@@ -1,90 +1,98 @@
-from collections import Counter
-from time import time
+import copy
+import uuid
 
-import pandas as pd
-from icecream import icecream
-
-from core.actions_matcher import create_corpus
-from core.text_classifier import add_character_names_to_dict
+from core import metrics
+from core.actions_matcher import create_corpus, create_filter_index
+from core.classification_pool import classify_texts_parallel
+from core.phrase_index import PhraseIndex, SoundexVocabulary
 from project.Action import Action
+from project.ClassesStatistics import ClassesStatistics
+from project.IngestionJob import IngestionProgress
 from project.Phrase import Phrase
 
 
 class ScriptFile:
-    def __init__(self, script_id, file_path, phrases, actions, character_names):
+    export_statistics = True
+
+    def __init__(self, script_id, file_path, phrases, actions, character_names, progress=None,
+                 export_statistics=True):
+        progress = progress or IngestionProgress()
+        self.export_statistics = export_statistics
+        self.version = uuid.uuid4().hex
         self.script_id = script_id
         self.url = file_path
         self.character_names = character_names
-        add_character_names_to_dict(character_names)
-        self.phrases = [Phrase(**phrase) for phrase in phrases]
-        start_time = time()
-        self.actions = [Action(**action) for action in actions]
-        icecream.ic(len(self.actions))
-        end_time = time()
-        print(f"Total processed in {end_time - start_time} seconds.")
-        self.idf_corpus = create_corpus(self.actions)
-        self.display_classes_statistics()
-
-    def update(self, script_id, file_path, phrases, actions, character_names):
+        with progress.stage('phrases'):
+            vocabulary = SoundexVocabulary()
+            self.phrases = [Phrase(**phrase, vocabulary=vocabulary) for phrase in phrases]
+            self.phrase_index = PhraseIndex(self.phrases, vocabulary)
+        with progress.stage('classification'):
+            self.actions = self._create_actions(actions, progress)
+        with progress.stage('corpus'):
+            self.actions_corpus = create_corpus(self.actions)
+            self.filter_index = create_filter_index(self.actions)
+        with progress.stage('statistics'):
+            self.statistics = ClassesStatistics(self.actions)
+            if self.export_statistics:
+                self.statistics.export_csv_async(self.script_id)
+
+    def clone(self):
+        script_file = copy.copy(self)
+        script_file.actions = list(self.actions)
+        script_file.actions_corpus = self.actions_corpus.copy()
+        script_file.statistics = self.statistics.copy()
+        return script_file
+
+    def update(self, script_id, file_path, phrases, actions, character_names, progress=None):
+        progress = progress or IngestionProgress()
+        self.version = uuid.uuid4().hex
         self.script_id = script_id
         self.url = file_path
-        self.phrases = [Phrase(**phrase) for phrase in phrases]
+        with progress.stage('phrases'):
+            vocabulary = SoundexVocabulary()
+            self.phrases = [Phrase(**phrase, vocabulary=vocabulary) for phrase in phrases]
+            self.phrase_index = PhraseIndex(self.phrases, vocabulary)
         self.character_names = character_names
-        add_character_names_to_dict(character_names)
 
         existing_actions_dict = {action.action_id: action for action in self.actions}
 
         new_action_ids = {action['action_id'] for action in actions}
 
+        changed_actions = []
         for new_action in actions:
             action_id = new_action['action_id']
             if action_id in existing_actions_dict:
                 existing_action = existing_actions_dict[action_id]
                 if new_action['last_update'] > existing_action.last_update:
-                    existing_actions_dict[action_id] = Action(**new_action)
+                    changed_actions.append(new_action)
             else:
+                changed_actions.append(new_action)
 
-                existing_actions_dict[action_id] = Action(**new_action)
-
-        for action_id in list(existing_actions_dict.keys()):
-            if action_id not in new_action_ids:
-                del existing_actions_dict[action_id]
-
-        self.actions = list(existing_actions_dict.values())
-        self.idf_corpus = create_corpus(self.actions)
-        self.display_classes_statistics()
-
-    def display_classes_statistics(self):
-        if len(self.actions) == 0:
-            return
-        all_classes = [cls for action in self.actions for cls in action.classes]
-        classes_count = Counter(all_classes)
-        df_classes = pd.DataFrame(classes_count.items(), columns=['Class', 'Frequency']).sort_values(by='Frequency',
-                                                                                                     ascending=False).reset_index(
-            drop=True)
-
-        classes_csv_filename = f"stats/{self.script_id}_class_statistics.csv"
-        df_classes.to_csv(classes_csv_filename, index=False)
-        print(f"Classes statistics saved to {classes_csv_filename}")
+        with progress.stage('classification'):
+            created_actions = self._create_actions(changed_actions, progress)
 
-        counts_data = []
-        for action in self.actions:
-            for (class_name, key), count in action.counts.items():
-                counts_data.append({'Class_Name': class_name, 'Key': key, 'Count': count})
-        df_counts = pd.DataFrame(counts_data).groupby(['Class_Name', 'Key'], as_index=False).sum().sort_values(
-            by='Count', ascending=False)
+        with progress.stage('statistics'):
+            for action in created_actions:
+                if action.action_id in existing_actions_dict:
+                    self.statistics.remove(existing_actions_dict[action.action_id])
+                self.statistics.add(action)
+                existing_actions_dict[action.action_id] = action
 
-        counts_csv_filename = f"stats/{self.script_id}_counts_statistics.csv"
-        df_counts.to_csv(counts_csv_filename, index=False)
-        print(f"Counts statistics saved to {counts_csv_filename}")
+            for action_id in list(existing_actions_dict.keys()):
+                if action_id not in new_action_ids:
+                    self.statistics.remove(existing_actions_dict.pop(action_id))
 
-        unused_words_data = []
-        for action in self.actions:
-            for word, count in action.unused.items():
-                unused_words_data.append({'Word': word, 'Count': count})
-        df_unused_words = pd.DataFrame(unused_words_data).groupby('Word', as_index=False).sum().sort_values(by='Count',
-                                                                                                            ascending=False)
-
-        unused_words_csv_filename = f"stats/{self.script_id}_unused_words_statistics.csv"
-        df_unused_words.to_csv(unused_words_csv_filename, index=False)
-        print(f"Unused words statistics saved to {unused_words_csv_filename}")
+        self.actions = list(existing_actions_dict.values())
+        with progress.stage('corpus'):
+            with metrics.timed('corpus_build', items=len(self.actions)):
+                self.actions_corpus.update(self.actions)
+            self.filter_index = create_filter_index(self.actions)
+        if self.export_statistics:
+            self.statistics.export_csv_async(self.script_id)
+
+    def _create_actions(self, actions, progress):
+        progress.set_total(len(actions))
+        classifications = classify_texts_parallel([action['text'] for action in actions], self.character_names,
+                                                  on_progress=progress.advance)
+        return [Action(**action, classification=classification)
+                for action, classification in zip(actions, classifications)]
@@ -0,0 +1,66 @@
+import os
+import threading
+import traceback
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from project.IngestionJob import IngestionJob
+from project.RoughCutProject import RoughCutProject, projects_storage
+from project.ScriptFile import ScriptFile
+
+INGESTION_WORKERS = int(os.environ.get('INGESTION_WORKERS', '2'))
+MAX_FINISHED_JOBS = 1000
+
+ingestion_executor = ThreadPoolExecutor(max_workers=INGESTION_WORKERS, thread_name_prefix='script-ingestion')
+ingestion_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_project_locks = defaultdict(threading.Lock)
+
+
+def ingest_script(project_id, data, progress=None):
+    with _project_locks[project_id]:
+        project = projects_storage.get(project_id)
+        if project is None:
+            project = RoughCutProject()
+        script_data = dict(script_id=data['script_id'], file_path=data['file_path'], phrases=data['phrases'],
+                           actions=data['actions'], character_names=data['character_names'])
+        if project.script_file is not None:
+            script_file = project.script_file.clone()
+            script_file.update(**script_data, progress=progress)
+        else:
+            script_file = ScriptFile(**script_data, progress=progress)
+        project.script_file = script_file
+        projects_storage[project_id] = project
+        return script_file
+
+
+def submit_ingestion(project_id, data):
+    job = IngestionJob(project_id)
+    with _jobs_lock:
+        ingestion_jobs[job.job_id] = job
+        _trim_finished_jobs()
+    ingestion_executor.submit(_run_job, job, data)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return ingestion_jobs.get(job_id)
+
+
+def _run_job(job, data):
+    job.start()
+    try:
+        ingest_script(job.project_id, data, progress=job)
+    except Exception as e:
+        traceback.print_exc()
+        job.finish(error=str(e))
+    else:
+        job.finish()
+
+
+def _trim_finished_jobs():
+    finished = [job_id for job_id, job in ingestion_jobs.items()
+                if job.status in (IngestionJob.DONE, IngestionJob.FAILED)]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del ingestion_jobs[job_id]
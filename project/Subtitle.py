@@ -1,3 +1,4 @@
+import heapq
 from typing import List, Optional, Dict, Any
 
 from project.MatchingResult import MatchingResult
@@ -67,35 +68,46 @@ class Subtitle:
         )
 
     @staticmethod
-    def generate_matched_combinations(subtitle_matches: Dict['Subtitle', List[MatchingResult]]) -> List[
-        List['Subtitle']]:
+    def generate_matched_combinations(subtitle_matches: Dict['Subtitle', List[MatchingResult]],
+                                      top_k: int = 1) -> List[List['Subtitle']]:
         subtitles = list(subtitle_matches.keys())
-
-        def recurse(subtitles: List['Subtitle'], index: int, current_combination: List['Subtitle'],
-                    all_combinations: List[List['Subtitle']]):
-            if index == len(subtitles):
-                all_combinations.append(current_combination)
-                return
-
-            for end_index in range(index, len(subtitles)):
-                range_to_merge = subtitles[index:end_index + 1]
-                merged_subtitle = Subtitle.merge(range_to_merge)
-                merged_subtitle.best_matches = [
-                    max(subtitle_matches[sub], key=lambda x: x.matching_count, default=None) for sub in range_to_merge
-                    if sub in subtitle_matches
-                ]
-                recurse(subtitles, end_index + 1, current_combination + [merged_subtitle], all_combinations)
-
-            if index > 0:
-                current_subtitle = subtitles[index]
-                current_subtitle.best_matches = sorted(subtitle_matches.get(current_subtitle, []),
-                                                       key=lambda x: x.matching_count)
-                recurse(subtitles, index + 1, current_combination + [current_subtitle], all_combinations)
-
-        all_combinations = []
-        recurse(subtitles, 0, [], all_combinations)
-
-        return [
-            [sub for sub in combination if sub.best_matches]
-            for combination in all_combinations
-        ]
+        top_matches = [max(subtitle_matches[sub], key=lambda x: x.matching_count, default=None) for sub in subtitles]
+
+        # layouts[end] holds the top_k segmentations of subtitles[:end] as
+        # (score, segments_count, last_segment_start, rank_in_layouts[last_segment_start]).
+        layouts = [[(0.0, 0, None, None)]]
+        for end in range(1, len(subtitles) + 1):
+            candidates = []
+            phrase_counts = {}
+            best_accuracy = 0.0
+            for start in range(end - 1, -1, -1):
+                match = top_matches[start]
+                if match is not None and match.phrase.words_count:
+                    count = phrase_counts.get(match.phrase.phrase_id, 0) + match.matching_count
+                    phrase_counts[match.phrase.phrase_id] = count
+                    best_accuracy = max(best_accuracy, min(count / match.phrase.words_count, 1))
+                segment_score = best_accuracy ** 2
+                for rank, (score, segments_count, _, _) in enumerate(layouts[start]):
+                    candidates.append((score + segment_score, segments_count + 1, start, rank))
+            layouts.append(heapq.nlargest(top_k, candidates, key=lambda candidate: (candidate[0], -candidate[1])))
+
+        merged_subtitles = {}
+
+        def merge_range(start: int, end: int) -> 'Subtitle':
+            if (start, end) not in merged_subtitles:
+                merged_subtitle = Subtitle.merge(subtitles[start:end])
+                merged_subtitle.best_matches = top_matches[start:end]
+                merged_subtitles[(start, end)] = merged_subtitle
+            return merged_subtitles[(start, end)]
+
+        combinations = []
+        for rank in range(len(layouts[-1])):
+            ranges = []
+            end = len(subtitles)
+            while end > 0:
+                _, _, start, previous_rank = layouts[end][rank]
+                ranges.append((start, end))
+                end, rank = start, previous_rank
+            combination = [merge_range(start, end) for start, end in reversed(ranges)]
+            combinations.append([sub for sub in combination if any(sub.best_matches)])
+        return combinations
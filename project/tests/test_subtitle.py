@@ -0,0 +1,49 @@
+from core import phrase_matcher  # noqa: F401  Phrase.prepare обращается к нему через пакет core
+from project.MatchingResult import MatchingResult
+from project.Phrase import Phrase
+from project.Subtitle import Subtitle
+
+SHORT_PHRASE = Phrase(phrase_id='p1', text='', phrase_text='привет мир')
+LONG_PHRASE = Phrase(phrase_id='p2', text='', phrase_text='пока добрый друг')
+
+
+def _subtitle_matches(counts):
+    return {Subtitle(text=f"субтитр {index}", start_time=float(index), end_time=float(index + 1)):
+            [MatchingResult(phrase=phrase, matching_count=count)]
+            for index, (phrase, count) in enumerate(counts)}
+
+
+def _layout(combination):
+    return [([match.phrase.phrase_id for match in subtitle.best_matches],
+             [match.matching_count for match in subtitle.best_matches])
+            for subtitle in combination]
+
+
+def test_fully_matched_subtitles_stay_separate():
+    subtitle_matches = _subtitle_matches([(SHORT_PHRASE, 2), (SHORT_PHRASE, 2), (SHORT_PHRASE, 2), (LONG_PHRASE, 3)])
+
+    combination, = Subtitle.generate_matched_combinations(subtitle_matches)
+
+    assert [subtitle.text for subtitle in combination] == ["субтитр 0", "субтитр 1", "субтитр 2", "субтитр 3"]
+    assert _layout(combination) == [(['p1'], [2]), (['p1'], [2]), (['p1'], [2]), (['p2'], [3])]
+
+
+def test_partial_matches_of_one_phrase_are_merged():
+    subtitle_matches = _subtitle_matches([(SHORT_PHRASE, 1), (SHORT_PHRASE, 1), (LONG_PHRASE, 1), (LONG_PHRASE, 2)])
+
+    combination, = Subtitle.generate_matched_combinations(subtitle_matches)
+
+    assert [(subtitle.text, subtitle.start_time, subtitle.end_time) for subtitle in combination] == [
+        ("субтитр 0 субтитр 1", 0.0, 2.0),
+        ("субтитр 2 субтитр 3", 2.0, 4.0),
+    ]
+    assert _layout(combination) == [(['p1', 'p1'], [1, 1]), (['p2', 'p2'], [1, 2])]
+
+
+def test_top_k_layouts_are_ordered_by_score():
+    subtitle_matches = _subtitle_matches([(SHORT_PHRASE, 2), (SHORT_PHRASE, 2), (LONG_PHRASE, 3)])
+
+    best, second = Subtitle.generate_matched_combinations(subtitle_matches, top_k=2)
+
+    assert _layout(best) == [(['p1'], [2]), (['p1'], [2]), (['p2'], [3])]
+    assert len(second) == 2
@@ -0,0 +1,34 @@
+import time
+
+import main
+from core import metrics
+from project.RoughCutProject import RoughCutProject
+
+STEP_SECONDS = 0.2
+FILES_COUNT = 3
+
+
+def _recorded(endpoint, method, status):
+    _, total = metrics.request_seconds.values.get((endpoint, method, status), (None, 0.0))
+    return total
+
+
+def test_request_latency_includes_streamed_body(monkeypatch):
+    def slow_results(files, script_file, results_cache, max_errors=0):
+        for file in files:
+            time.sleep(STEP_SECONDS)
+            yield {"file": {"subtitles": [], "id": file["id"]}}
+
+    project = RoughCutProject()
+    project.script_file = object()
+    monkeypatch.setattr(main.projects_storage, 'get', lambda project_id: project)
+    monkeypatch.setattr(main, 'iter_cached_match_phrases', slow_results)
+    before = _recorded('/matchPhrases', 'POST', 201)
+
+    files = [{"id": f"f{index}", "subtitles": []} for index in range(FILES_COUNT)]
+    response = main.app.test_client().post('/matchPhrases', json={"project_id": "P", "stream": True, "files": files})
+
+    assert len(response.data.splitlines()) == FILES_COUNT
+    # WSGI-сервер закрывает ответ после отправки тела, тестовый клиент этого сам не делает.
+    response.close()
+    assert _recorded('/matchPhrases', 'POST', 201) - before >= STEP_SECONDS * FILES_COUNT